@@ -0,0 +1,176 @@
+"""
+Batch Scoring for Customer Churn
+- Stream a raw customer file in chunks through cleaning and feature engineering
+- Score each chunk with the saved model and training-time statistics
+- Append churn probabilities to the output CSV
+- Keep the top-K most-at-risk customers in a bounded heap
+
+Usage:
+python scripts/batch_scoring.py --input ./data/raw/telco_customer_churn_data.csv --top-k 5000
+"""
+import sys
+import os
+import heapq
+import argparse
+from pathlib import Path
+
+# Add project root to Python path
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import numpy as np
+import pandas as pd
+
+from src.modeling import load_model, predict_churn_proba
+from src.encoding import encode_categorical_columns
+from data_cleaning import convert_yes_no_columns, coerce_numeric_columns, impute_zero_tenure_values
+from feature_engineering_all import create_all_features
+
+# Numeric input columns, TotalCharges is converted and imputed by impute_zero_tenure_values
+NUMERIC_INPUT_COLUMNS = ["SeniorCitizen", "tenure", "MonthlyCharges"]
+
+
+def _validate_scoring_inputs(raw_df, clean_df, yes_no_cols):
+    """
+    Raise a ValueError naming every field with a value that could not be converted:
+    numeric columns that are not numbers and Yes/No columns that are not 'Yes' or 'No'.
+    """
+    checks = [(col, "a number") for col in NUMERIC_INPUT_COLUMNS] + [(col, "'Yes' or 'No'") for col in yes_no_cols]
+    errors = []
+    for col, expected in checks:
+        if col not in clean_df.columns:
+            continue
+        invalid = clean_df[col].isna()
+        for row in np.flatnonzero(invalid.to_numpy())[:10]:
+            customer = raw_df["customerID"].iloc[row] if "customerID" in raw_df.columns else row
+            errors.append(f"{col}={raw_df[col].iloc[row]!r} for customer {customer} (expected {expected})")
+    if errors:
+        raise ValueError(f"Invalid customer record values: {'; '.join(errors)}")
+
+
+def prepare_scoring_features(raw_df, model_bundle):
+    """
+    Clean raw customer records and build the model feature matrix with the training-time
+    Yes/No columns, category vocabulary and feature statistics stored in the model bundle.
+    Parameters:
+    raw_df(pd.DataFrame): raw customer records (the input columns of the dataset, Churn optional)
+    model_bundle(dict): Output of fit_final_model / load_model
+
+    Returns:
+    features(np.ndarray): float matrix with the columns of model_bundle['feature_cols']
+    """
+    preprocessing = model_bundle["preprocessing"]
+    df = raw_df.copy()
+    df.columns = df.columns.str.strip()
+
+    numeric_df = coerce_numeric_columns(df, NUMERIC_INPUT_COLUMNS)
+    zero_one_df = convert_yes_no_columns(numeric_df, columns=preprocessing["yes_no_cols"], verbose=False)
+    _validate_scoring_inputs(df, zero_one_df, preprocessing["yes_no_cols"])
+    # A small batch can be mostly zero-tenure blanks, so the non-numeric threshold is relaxed,
+    # values still missing after imputation raise as in training
+    filled_df = impute_zero_tenure_values(zero_one_df, "TotalCharges", threshold=1.0, verbose=False)
+    # Same integer codes as in training, categories unseen in training are encoded as -1
+    if preprocessing.get("vocabulary") is not None:
+        filled_df = encode_categorical_columns(filled_df, preprocessing["vocabulary"], verbose=False)
+    df_features, _, _ = create_all_features(filled_df, feature_stats=preprocessing["feature_stats"])
+
+    missing_cols = [col for col in model_bundle["feature_cols"] if col not in df_features.columns]
+    if missing_cols:
+        raise KeyError(f"Scoring data is missing model features: {missing_cols}")
+
+    return df_features[model_bundle["feature_cols"]].to_numpy(dtype=np.float64)
+
+""" # EXAMPLE USAGE
+features = prepare_scoring_features(raw_df, model_bundle) """
+
+
+def _update_top_k(heap, ids, proba, top_k, counter):
+    """
+    Push a chunk's scores into a min-heap holding the top_k highest probabilities.
+    Only the chunk's own top_k candidates that beat the current heap minimum are pushed.
+    """
+    if len(proba) > top_k:
+        candidates = np.argpartition(-proba, top_k - 1)[:top_k]
+    else:
+        candidates = np.arange(len(proba))
+    if len(heap) == top_k:
+        candidates = candidates[proba[candidates] > heap[0][0]]
+
+    for i in candidates:
+        # The counter breaks ties so customer IDs are never compared
+        entry = (float(proba[i]), next(counter), ids[i])
+        if len(heap) < top_k:
+            heapq.heappush(heap, entry)
+        elif entry[0] > heap[0][0]:
+            heapq.heapreplace(heap, entry)
+
+
+def score_customers_in_chunks(input_path, model_bundle, output_path, top_k=5000, chunk_size=100_000, id_col="customerID"):
+    """
+    Score a raw customer CSV chunk by chunk, writing churn probabilities as it goes.
+    Memory is bounded by chunk_size + top_k rows and the run is linear in the number of customers.
+    Parameters:
+    input_path(str): Path to the raw customer CSV
+    model_bundle(dict): Output of fit_final_model / load_model
+    output_path(str): Path of the CSV receiving id_col and churn_probability for every customer
+    top_k(int, default 5000): Number of most-at-risk customers to return
+    chunk_size(int, default 100000): Number of rows read and scored at a time
+    id_col(str, default 'customerID'): Customer identifier column
+
+    Returns:
+    top_k_df(pd.DataFrame): the top_k customers by churn probability, highest first
+    """
+    if not os.path.exists(input_path):
+        raise FileNotFoundError(f"CSV data file not found at: {input_path}")
+    if top_k < 1:
+        raise ValueError("top_k must be at least 1.")
+
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    heap = []
+    counter = iter(range(sys.maxsize))
+    n_scored = 0
+
+    for chunk_idx, chunk in enumerate(pd.read_csv(input_path, chunksize=chunk_size)):
+        chunk.columns = chunk.columns.str.strip()
+        if id_col not in chunk.columns:
+            raise KeyError(f"Identifier column '{id_col}' not found in {input_path}.")
+
+        proba = predict_churn_proba(model_bundle, prepare_scoring_features(chunk, model_bundle))
+        ids = chunk[id_col].to_numpy()
+
+        pd.DataFrame({id_col: ids, "churn_probability": proba}).to_csv(
+            output_path, mode="w" if chunk_idx == 0 else "a", header=chunk_idx == 0, index=False
+        )
+        _update_top_k(heap, ids, proba, top_k, counter)
+        n_scored += len(chunk)
+        print(f"Scored {n_scored} customers")
+
+    # Only the heap (top_k rows) is ever sorted
+    top_k_entries = sorted(heap, key=lambda entry: entry[0], reverse=True)
+    top_k_df = pd.DataFrame(
+        [(customer_id, score) for score, _, customer_id in top_k_entries],
+        columns=[id_col, "churn_probability"]
+    )
+    print(f"Churn probabilities for {n_scored} customers saved to: {output_path}")
+    return top_k_df
+
+""" # EXAMPLE USAGE
+top_k_df = score_customers_in_chunks(RAW_DATA_PATH, model_bundle, SCORES_PATH, top_k=5000) """
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score a raw customer file and rank the customers most at risk of churning.")
+    parser.add_argument("--input", default="./data/raw/telco_customer_churn_data.csv", help="raw customer CSV to score")
+    parser.add_argument("--model", default="./models/churn_logistic_regression.joblib", help="model saved by churn_main.py")
+    parser.add_argument("--output", default="./data/scored/telco_customer_churn_scores.csv", help="CSV receiving every churn probability")
+    parser.add_argument("--top-k-output", default="./data/scored/telco_customer_churn_top_at_risk.csv", help="CSV receiving the top-K ranking")
+    parser.add_argument("--top-k", type=int, default=5000, help="number of most-at-risk customers to keep")
+    parser.add_argument("--chunk-size", type=int, default=100_000, help="rows read and scored at a time")
+    args = parser.parse_args()
+
+    model_bundle = load_model(args.model)
+    top_k_df = score_customers_in_chunks(args.input, model_bundle, args.output, top_k=args.top_k, chunk_size=args.chunk_size)
+
+    os.makedirs(os.path.dirname(args.top_k_output), exist_ok=True)
+    top_k_df.to_csv(args.top_k_output, index=False)
+    print(f"Top {len(top_k_df)} at-risk customers saved to: {args.top_k_output}")
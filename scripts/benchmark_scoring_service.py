@@ -0,0 +1,131 @@
+"""
+Latency and Throughput Benchmark for the Churn Scoring Service
+- Starts the scoring service in-process on a free local port
+- A stand-in client opens concurrent keep-alive connections and posts single customer records
+- Reports p50/p99 latency and throughput for each micro-batching window
+
+Usage:
+python scripts/benchmark_scoring_service.py --input ./data/raw/telco_customer_churn_data.csv --concurrency 64
+"""
+import sys
+import json
+import time
+import asyncio
+import argparse
+from pathlib import Path
+
+# Add project root to Python path
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import numpy as np
+import pandas as pd
+
+from src.modeling import load_model
+from scoring_service import INPUT_COLUMNS, start_scoring_server
+
+
+async def post_json(reader, writer, path, payload):
+    """
+    Stand-in HTTP client: send one JSON POST on an open keep-alive connection.
+    Returns (status code, decoded JSON body).
+    """
+    body = json.dumps(payload).encode("utf-8")
+    writer.write(
+        f"POST {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+    )
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    response = await reader.readexactly(int(headers["content-length"]))
+    return status, json.loads(response)
+
+
+async def _client(host, port, records, latencies):
+    """Post the given records one at a time over a single connection, recording latencies."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for record in records:
+            start = time.perf_counter()
+            status, response = await post_json(reader, writer, "/score", record)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                raise RuntimeError(f"Scoring request failed with {status}: {response}")
+    finally:
+        writer.close()
+
+
+async def run_benchmark(model_bundle, records, concurrency=64, n_requests=5000, max_batch_size=256, max_wait_ms=5.0):
+    """
+    Benchmark the scoring service with concurrent single-record requests.
+    Parameters:
+    model_bundle(dict): Output of fit_final_model / load_model
+    records(list): raw customer records to send, reused round-robin
+    concurrency(int, default 64): Number of concurrent client connections
+    n_requests(int, default 5000): Total number of requests
+    max_batch_size(int, default 256): Largest micro-batch
+    max_wait_ms(float, default 5.0): Micro-batching latency window in milliseconds
+
+    Returns:
+    summary(dict): requests, throughput (req/s), p50/p99 latency (ms) and mean batch size
+    """
+    server, state = await start_scoring_server(model_bundle, "127.0.0.1", 0, max_batch_size, max_wait_ms)
+    port = server.sockets[0].getsockname()[1]
+
+    latencies = []
+    per_client = [
+        [records[i % len(records)] for i in range(client, n_requests, concurrency)]
+        for client in range(concurrency)
+    ]
+    start = time.perf_counter()
+    await asyncio.gather(*(_client("127.0.0.1", port, client_records, latencies) for client_records in per_client))
+    elapsed = time.perf_counter() - start
+
+    server.close()
+    await server.wait_closed()
+    state["worker"].cancel()
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "max_wait_ms": max_wait_ms,
+        "requests": len(latencies),
+        "throughput_rps": len(latencies) / elapsed,
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "mean_batch_size": state["n_records"] / max(state["n_batches"], 1)
+    }
+
+""" # EXAMPLE USAGE
+summary = asyncio.run(run_benchmark(model_bundle, records, concurrency=64, n_requests=5000)) """
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure latency and throughput of the churn scoring service.")
+    parser.add_argument("--input", default="./data/raw/telco_customer_churn_data.csv", help="raw customer CSV to draw records from")
+    parser.add_argument("--model", default="./models/churn_logistic_regression.joblib", help="model saved by churn_main.py")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--max-batch-size", type=int, default=256)
+    parser.add_argument("--max-wait-ms", type=float, nargs="+", default=[0.0, 2.0, 5.0, 10.0],
+                        help="micro-batching windows to compare")
+    args = parser.parse_args()
+
+    model_bundle = load_model(args.model)
+    # Read everything as text, like records arriving from an upstream system, the service converts the numbers
+    raw_df = pd.read_csv(args.input, nrows=10_000, dtype=str, keep_default_na=False)
+    raw_df.columns = raw_df.columns.str.strip()
+    records = raw_df[INPUT_COLUMNS].to_dict(orient="records")
+
+    results = [
+        asyncio.run(run_benchmark(model_bundle, records, args.concurrency, args.requests, args.max_batch_size, max_wait_ms))
+        for max_wait_ms in args.max_wait_ms
+    ]
+    print(pd.DataFrame(results).round(2).to_string(index=False))
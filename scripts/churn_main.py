@@ -1,13 +1,23 @@
 import sys
+import os
+from datetime import date
 from pathlib import Path
 
 # Add project root to Python path
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 sys.path.append(str(PROJECT_ROOT))
 
-from src.utils import download_file_from_google_drive, load_data_csv, save_data
-from data_cleaning import clean_data, convert_yes_no_columns, impute_zero_tenure_values
-from exploratory_analysis import plot_churn_counts, plot_service_vs_churn, plot_tenure_eda, plot_contract_eda
+from src.utils import download_file_from_google_drive, ingest_snapshot, load_data_partitioned, save_data, save_features_memmap, load_features_memmap, get_numeric_feature_columns
+from src.modeling import search_logistic_regression, out_of_fold_predictions, fit_final_model, save_model
+from src.survival_analysis import create_survival_table
+from src.feature_engineering import compute_feature_statistics
+from src.drift_monitor import build_feature_profile, save_profile, load_profile, compare_profiles, drift_gate
+from src.reliability import segment_churn_rate_ci, model_metric_ci
+from src.encoding import fit_category_vocabulary, encode_categorical_columns, save_vocabulary
+from src.sampling import stratified_reservoir_sample, WEIGHT_COL
+from src.segment_index import build_segment_index, segment_churn_counts, top_churn_segments
+from data_cleaning import clean_data, find_yes_no_columns, convert_yes_no_columns, impute_zero_tenure_values
+from exploratory_analysis import plot_churn_counts, plot_service_vs_churn, plot_tenure_eda, plot_contract_eda, plot_survival_curves
 from feature_engineering_all import create_all_features, save_features_to_excel, feature_correlation
 
 file_id = "1763OlxZ9Fun9-x3GYi6BUu_7ot9AfEkJ"   # replace with  file ID
@@ -17,31 +27,51 @@ download_file_from_google_drive(file_id, destination)
 
 # Paths
 RAW_DATA_PATH = destination
+DATASET_ROOT = "./data/dataset"  # snapshots partitioned by snapshot_date and Contract
 PROCESSED_DATA_PATH = "./data/processed/telco_customer_churn_data_cleaned.csv"
 
+# Ingest the download as this month's snapshot, earlier snapshots stay in the dataset
+snapshot = date.today().replace(day=1).isoformat()
+ingest_snapshot(RAW_DATA_PATH, DATASET_ROOT, snapshot, partition_cols=("Contract",))
+
 # Load Data
-raw_df = load_data_csv(RAW_DATA_PATH)
+raw_df = load_data_partitioned(DATASET_ROOT, snapshots=[snapshot]).drop(columns="snapshot_date")
 
 # Transform Data
 clean_df = clean_data(raw_df, "Churn")
-zero_one_bool_df = convert_yes_no_columns(clean_df)
+yes_no_cols = find_yes_no_columns(clean_df)
+zero_one_bool_df = convert_yes_no_columns(clean_df, columns=yes_no_cols)
 filled_total_charges_df = impute_zero_tenure_values(zero_one_bool_df, "TotalCharges")
 
 save_data(filled_total_charges_df, PROCESSED_DATA_PATH)
 
+# Encode the categorical columns once as integer codes, the vocabulary is reused at scoring time
+VOCABULARY_PATH = "./data/processed/telco_customer_churn_category_vocabulary.json"
+vocabulary = fit_category_vocabulary(filled_total_charges_df)
+save_vocabulary(vocabulary, VOCABULARY_PATH)
+encoded_df = encode_categorical_columns(filled_total_charges_df, vocabulary)
+
 #EDA
+# On very large extracts plot a stratified sample, rates are reweighted to the population with sampling error bars
+EDA_SAMPLE_MODE = False
+eda_df, eda_weight_col = encoded_df, None
+if EDA_SAMPLE_MODE:
+    eda_df = encoded_df.assign(tenure_group_6m=(encoded_df["tenure"] // 6) * 6)
+    eda_df = stratified_reservoir_sample(eda_df, ["Churn", "Contract", "InternetService", "tenure_group_6m"], per_stratum=2000)
+    eda_weight_col = WEIGHT_COL
+
 churn_visual_path = './visuals/eda/churn_count_eval.png'
-plot_churn_counts(filled_total_charges_df, 'Churn', churn_visual_path)
+plot_churn_counts(eda_df, 'Churn', churn_visual_path, weight_col=eda_weight_col)
 
 service_col = ["PhoneService"]
 phone_service_visual_path = './visuals/eda/phone_service_churned_eval.png'
 phone_service_title = "Phone Service vs Churn Rate"
-plot_service_vs_churn(filled_total_charges_df, service_col,title=phone_service_title,save_path=phone_service_visual_path)
+plot_service_vs_churn(eda_df, service_col,title=phone_service_title,save_path=phone_service_visual_path, n_bootstrap=10000, weight_col=eda_weight_col)
 
 service_col = ["InternetService"]
 internet_service_visual_path = './visuals/eda/internet_service_churned_eval.png'
 internet_service_title = "Internet Service vs Churn Rate"
-plot_service_vs_churn(filled_total_charges_df, service_col,title=internet_service_title,save_path=internet_service_visual_path)
+plot_service_vs_churn(eda_df, service_col,title=internet_service_title,save_path=internet_service_visual_path, n_bootstrap=10000, weight_col=eda_weight_col)
 
 addon_cols = [
     "OnlineSecurity",
@@ -53,26 +83,102 @@ addon_cols = [
 ]
 add_ons_service_visual_path = './visuals/eda/add_ons_service_churned_eval.png'
 add_ons_service_title = f"{addon_cols} Service vs Churn Rate"
-plot_service_vs_churn(filled_total_charges_df, service_col=addon_cols, eligible_condition = "InternetService != 'No'", title=add_ons_service_title,save_path=add_ons_service_visual_path)
+plot_service_vs_churn(eda_df, service_col=addon_cols, eligible_condition = "InternetService != 'No'", title=add_ons_service_title,save_path=add_ons_service_visual_path, n_bootstrap=10000, weight_col=eda_weight_col)
 
 tenure_visual_path = './visuals/eda/tenure_count_eval.png'
-plot_tenure_eda(filled_total_charges_df, title="Count by Tenure", save_path=tenure_visual_path)
+plot_tenure_eda(eda_df, title="Count by Tenure", save_path=tenure_visual_path, n_bootstrap=10000, weight_col=eda_weight_col)
 
 contract_visual_path = './visuals/eda/contract_churned_eval.png'
-plot_contract_eda(filled_total_charges_df, title="Contract vs Churn Rate", save_path=contract_visual_path)
+plot_contract_eda(eda_df, title="Contract vs Churn Rate", save_path=contract_visual_path, n_bootstrap=10000, weight_col=eda_weight_col)
+
+# Reliability: bootstrap confidence intervals of segment churn rates
+for segment_col in ["Contract", "InternetService", "PaymentMethod"]:
+    churn_rate_ci_df = segment_churn_rate_ci(encoded_df, segment_col, n_replicates=10000)
+    print(churn_rate_ci_df)
+
+# Survival Analysis
+segment_cols = ["Contract", "InternetService", "PaymentMethod"]
+survival_df = create_survival_table(encoded_df, segment_cols=segment_cols)
+SURVIVAL_DATA_PATH = "./data/processed/telco_customer_churn_survival_data.csv"
+save_data(survival_df, SURVIVAL_DATA_PATH)
+
+for segment_col in segment_cols:
+    survival_visual_path = f'./visuals/eda/{segment_col.lower()}_survival_eval.png'
+    plot_survival_curves(survival_df, segment_col, title=f"{segment_col} Retention Curve (Kaplan-Meier)", save_path=survival_visual_path)
+
+# Segment Explorer
+segment_index = build_segment_index(encoded_df)
+fiber_no_support_segment = {
+    "InternetService": "Fiber optic",
+    "TechSupport": "No",
+    "Contract": "Month-to-month",
+    "PaymentMethod": "Electronic check"
+}
+print(f"Fiber, no TechSupport, month-to-month, electronic check: {segment_churn_counts(segment_index, fiber_no_support_segment)}")
+
+top_segments_df = top_churn_segments(segment_index, depth=3, top_n=20, min_customers=100)
+TOP_SEGMENTS_DATA_PATH = "./data/processed/telco_customer_churn_top_segments.csv"
+save_data(top_segments_df, TOP_SEGMENTS_DATA_PATH)
 
 # Feature Engineering
 FEATURES_DATA_PATH = "./data/processed/telco_customer_churn_features_data.xlsx"
-df_features, columns_to_add, sheet_names = create_all_features(filled_total_charges_df)
+feature_stats = compute_feature_statistics(encoded_df)
+df_features, columns_to_add, sheet_names = create_all_features(encoded_df, feature_stats=feature_stats)
 
 save_features_to_excel(df_features, columns_to_add, FEATURES_DATA_PATH, sheet_names)
 
 ALL_FEATURES_DATA_PATH = "./data/processed/telco_customer_churn_all_features_data.csv"
 save_data(df_features, ALL_FEATURES_DATA_PATH)
 
+FEATURES_MATRIX_DIR = "./data/processed/telco_customer_churn_features_matrix"
+save_features_memmap(df_features, columns_to_add, sheet_names, FEATURES_MATRIX_DIR, vocabulary=vocabulary)
+
+# Drift Monitoring: profile this extract and compare it with the snapshot the current model was trained on
+PROFILES_DIR = "./data/profiles"
+REFERENCE_PROFILE_PATH = f"{PROFILES_DIR}/reference_profile.json"
+numeric_feature_cols = get_numeric_feature_columns(df_features, columns_to_add)
+if os.path.exists(REFERENCE_PROFILE_PATH):
+    reference_profile = load_profile(REFERENCE_PROFILE_PATH)
+    current_profile = build_feature_profile(df_features, reference_profile=reference_profile, snapshot=snapshot)
+    drift_df = compare_profiles(reference_profile, current_profile)
+    save_data(drift_df, f"./data/processed/telco_customer_churn_drift_{snapshot}.csv")
+    retrain, drifted_features = drift_gate(drift_df)
+else:
+    # First extract trains the first model and becomes the reference once it is saved
+    retrain = True
+    current_profile = build_feature_profile(df_features, numeric_feature_cols, snapshot=snapshot)
+save_profile(current_profile, f"{PROFILES_DIR}/profile_{snapshot}.json")
+
 corr_cols = ["Churn", "tenure_normalized", "avg_monthly_spend", 
              "lifetime_value", "num_active_services", "fiber_customer_flag",
              "household_size", "is_month_to_month", "payment_auto_flag"]
 weighted_features_df = df_features[corr_cols]
 features_visual_path = './visuals/eda/features_correlation_eval.png'
-feature_correlation (weighted_features_df, features_visual_path)
\ No newline at end of file
+feature_correlation (weighted_features_df, features_visual_path)
+
+# Modeling: retrain only on the first extract or when the drift gate flags it
+MODEL_PATH = "./models/churn_logistic_regression.joblib"
+if retrain or not os.path.exists(MODEL_PATH):
+    features, labels, features_metadata = load_features_memmap(FEATURES_MATRIX_DIR)
+    CV_CACHE_DIR = "./data/processed/cv_cache"
+    best_params, search_results_df = search_logistic_regression(features, labels, n_splits=5, n_jobs=-1, cache_dir=CV_CACHE_DIR)
+    SEARCH_RESULTS_PATH = "./data/processed/telco_customer_churn_model_search.csv"
+    save_data(search_results_df, SEARCH_RESULTS_PATH)
+
+    # Reliability: bootstrap confidence intervals of out-of-fold model metrics
+    y_true, y_score = out_of_fold_predictions(features, labels, best_params, n_splits=5, cache_dir=CV_CACHE_DIR)
+    metrics_df, calibration_df = model_metric_ci(y_true, y_score, k=(100, 500), n_replicates=10000)
+    print(metrics_df)
+    print(calibration_df)
+    METRICS_CI_PATH = "./data/processed/telco_customer_churn_model_metrics_ci.csv"
+    save_data(metrics_df.reset_index(), METRICS_CI_PATH)
+
+    preprocessing = {"yes_no_cols": yes_no_cols, "vocabulary": vocabulary, "feature_stats": feature_stats}
+    model_bundle = fit_final_model(features, labels, features_metadata["columns"], best_params, preprocessing=preprocessing)
+    save_model(model_bundle, MODEL_PATH)
+    # The new model is trained on this snapshot, later snapshots are compared with it
+    save_profile(current_profile, REFERENCE_PROFILE_PATH)
+else:
+    print(f"No significant drift in snapshot {snapshot}, retraining skipped. Keeping the model at: {MODEL_PATH}")
+
+# Scoring: python scripts/batch_scoring.py --input <raw customer csv> --top-k 5000
@@ -52,31 +52,67 @@ def clean_data(raw_df, target_variable):
     print("Data cleaning complete.")
     return cleaned_df
 
+def find_yes_no_columns(cleaned_df):
+    """
+    List the columns containing ONLY 'Yes' and 'No' values.
+    Parameters
+    cleaned_df(pd.DataFrame): Input DataFrame
+
+    Returns
+    yes_no_cols(list): names of the Yes/No columns
+    """
+    # Get unique non-null values, check if column contains ONLY Yes/No
+    return [
+        col for col in cleaned_df.columns
+        if set(cleaned_df[col].dropna().unique()) == {'Yes', 'No'}
+    ]
+
 # 2. Turn Booleans into 0 and 1 values as this is mandatory for modeling
-def convert_yes_no_columns(cleaned_df):
+def convert_yes_no_columns(cleaned_df, columns=None, verbose=True):
     """
     Convert columns containing ONLY 'Yes' and 'No' values to binary (1/0).
     Parameters
     cleaned_df(pd.DataFrame): Input DataFrame
+    columns(list, optional): Columns to convert. Defaults to the columns found by find_yes_no_columns;
+    pass the training-time list when converting scoring batches, whose values may not cover both Yes and No
+    verbose(bool, default True): Print each converted column
 
     Returns
     zero_one_df(pd.DataFrame): DataFrame with Yes/No columns converted to 1/0
     """
     zero_one_df = cleaned_df.copy()
 
-    for col in zero_one_df.columns:
-        # Get unique non-null values
-        unique_vals = set(zero_one_df[col].dropna().unique())
+    if columns is None:
+        columns = find_yes_no_columns(zero_one_df)
 
-        # Check if column contains ONLY Yes/No
-        if unique_vals == {'Yes', 'No'}:
-            zero_one_df[col] = zero_one_df[col].map({'Yes': 1, 'No': 0})
+    for col in columns:
+        if col not in zero_one_df.columns:
+            continue
+        zero_one_df[col] = zero_one_df[col].map({'Yes': 1, 'No': 0})
+        if verbose:
             print(f"Converted '{col}' to binary")
 
     return zero_one_df
 #Yes/No features were mapped to binary numeric values, allowing pandas to infer integer types.
 
-def impute_zero_tenure_values(df, target_col, tenure_col='tenure', threshold=0.1):
+def coerce_numeric_columns(df, columns):
+    """
+    Convert numeric columns that may arrive as text (e.g. '12' from JSON or string CSV readers)
+    to numbers, invalid values become NaN.
+    Parameters
+    df(pd.DataFrame): Input DataFrame
+    columns(list): Columns to convert, missing columns are skipped
+
+    Returns
+    numeric_df(pd.DataFrame): DataFrame with the columns converted to numeric
+    """
+    numeric_df = df.copy()
+    for col in columns:
+        if col in numeric_df.columns:
+            numeric_df[col] = pd.to_numeric(numeric_df[col], errors='coerce')
+    return numeric_df
+
+def impute_zero_tenure_values(df, target_col, tenure_col='tenure', threshold=0.1, verbose=True):
     """
     Impute missing values in a numeric column based on zero-tenure logic.
     - Converts the target column to numeric
@@ -89,6 +125,7 @@ def impute_zero_tenure_values(df, target_col, tenure_col='tenure', threshold=0.1
     target_col(str): Column to be cleaned and imputed (e.g. 'TotalCharges')
     tenure_col(str, optional): Tenure column name (default is 'tenure')
     threshold(float, optional): Maximum fraction of non-numeric values allowed before raising an error (default 0.1)
+    verbose(bool, optional): Print the result and the column dtypes (default True)
     
     Returns
     filled_df(pd.DataFrame): Filled DataFrame
@@ -135,8 +172,9 @@ def impute_zero_tenure_values(df, target_col, tenure_col='tenure', threshold=0.1
             f"❌ Column '{target_col}' still contains missing values after imputation."
         )
 
-    print(f"'{target_col}' cleaned and imputed using {tenure_col} logic.")
-    print(filled_df.dtypes)
+    if verbose:
+        print(f"'{target_col}' cleaned and imputed using {tenure_col} logic.")
+        print(filled_df.dtypes)
 
     return filled_df
 # These customers of 0 tenure have blank total charges in original df, may affect ML model, no charges = 0
\ No newline at end of file
@@ -1,9 +1,38 @@
+import sys
+from pathlib import Path
+
+# Add project root to Python path
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
 import os
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
+from matplotlib.ticker import MaxNLocator, StrMethodFormatter
+
+from src.reliability import segment_churn_rate_ci
+from src.sampling import weighted_churn_rates, weighted_counts
+
+
+def _plot_churn_rate_error_bars(ax, ci_df, scale=1):
+    """Draw bootstrap confidence intervals of churn rates on top of a bar plot."""
+    ax.errorbar(
+        range(len(ci_df)),
+        ci_df["ChurnRate"] * scale,
+        yerr=[(ci_df["ChurnRate"] - ci_df["ChurnRateLower"]) * scale, (ci_df["ChurnRateUpper"] - ci_df["ChurnRate"]) * scale],
+        fmt="none", ecolor="black", elinewidth=1.5, capsize=6
+    )
+
+
+def _adapt_count_axis(ax, max_count):
+    """Scale a count axis to the data: about 10 integer ticks with thousands separators."""
+    ax.set_ylim(0, max_count * 1.1)
+    ax.yaxis.set_major_locator(MaxNLocator(nbins=10, integer=True))
+    ax.yaxis.set_major_formatter(StrMethodFormatter("{x:,.0f}"))
 
-def plot_churn_counts(df, target_col='Churn', save_path='visuals/eda/churn_count_eval.png'):
+
+def plot_churn_counts(df, target_col='Churn', save_path='visuals/eda/churn_count_eval.png', weight_col=None):
     """
     Plots the count of churn vs non-churn customers and saves the plot.
     
@@ -11,26 +40,38 @@ def plot_churn_counts(df, target_col='Churn', save_path='visuals/eda/churn_count
     df(pd.DataFrame): DataFrame containing the target column
     target_col(str, default 'Churn'): Column name for churn labels
     save_path(str, default):'visuals/eda': Path to save the plot image
+    weight_col(str, optional): Sampling weight column of a stratified sample (from stratified_reservoir_sample),
+    counts are then scaled to population totals and annotated with their 95% sampling error
     """
-    # --- Plot countplot ---
+    # --- Count customers (population estimates when plotting a sample) ---
+    if weight_col is None:
+        counts = df.groupby(target_col).size()
+        labels = [f"{count:,}" for count in counts]
+    else:
+        counts_df = weighted_counts(df, target_col, weight_col)
+        counts = counts_df["Customers"]
+        labels = [
+            f"{count:,.0f}\n± {1.96 * error:,.0f}"
+            for count, error in zip(counts, counts_df["CustomersStdError"])
+        ]
+
+    # --- Plot counts ---
     plt.figure(figsize=(8,6))
 
-    # Set y-axis ticks from 0 to 5000 at intervals of 500
-    plt.yticks(range(0, 5001, 500))
-
     # Add grid
     plt.grid(axis='y', color='gray', linestyle='--', linewidth=1, alpha=0.7)
 
-    ax = sns.countplot(x=target_col, data=df, palette='Set2')
+    ax = sns.barplot(x=counts.index.astype(str), y=counts.values, palette='Set2')
+    _adapt_count_axis(ax, counts.max())
+    ax.set_xlabel(target_col)
+    ax.set_ylabel("count")
 
     # --- Annotate counts on top of bars ---
-    for p in ax.patches:
-        count = int(p.get_height())
-        ax.annotate(f'{count}', 
-                    (p.get_x() + p.get_width()/2., count), 
+    for p, label in zip(ax.patches, labels):
+        ax.annotate(label,
+                    (p.get_x() + p.get_width()/2., p.get_height()), 
                     ha='center', va='bottom', fontsize=12, color='green')
 
-    sns.countplot(x=target_col, data=df, palette='Set2')
     # --- Add title and explanation ---
     plt.title(f"{target_col} vs Non-{target_col} Customers\n(Yes = 1: Churned, No = 0: Retained)", fontsize=12)
 
@@ -44,7 +85,7 @@ def plot_churn_counts(df, target_col='Churn', save_path='visuals/eda/churn_count
 
 
 # Hierarchical service dependencies:
-def plot_service_vs_churn(df, service_col, churn_col="Churn",eligible_condition=None, title=None, save_path='visuals/eda/eval.png'):
+def plot_service_vs_churn(df, service_col, churn_col="Churn",eligible_condition=None, title=None, save_path='visuals/eda/eval.png', n_bootstrap=None, weight_col=None):
     """
     Plots churn rate for a given service among eligible customers only.
     Parameters:
@@ -54,6 +95,9 @@ def plot_service_vs_churn(df, service_col, churn_col="Churn",eligible_condition=
     eligible_condition(str): The condition that the service meets
     title(str): Title of the visual
     save_path(str, default):'visuals/eda': Path to save the plot image
+    n_bootstrap(int, optional): Number of bootstrap replicates for 95% churn rate error bars
+    weight_col(str, optional): Sampling weight column of a stratified sample (from stratified_reservoir_sample),
+    churn rates are then reweighted to the population with 95% sampling error bars
     """
 
     data = df.copy()
@@ -66,12 +110,24 @@ def plot_service_vs_churn(df, service_col, churn_col="Churn",eligible_condition=
         service_list = []
 
         for col in service_col:
-            total_service_counts = data.groupby(col).size()
-            service_churn_total = (
-                data.groupby(col)[churn_col].apply(lambda x: (x == 1).sum())
-            ) # x == 1, represents 'Churn' == 'Yes'
-            # Compute churn rate, mean applies avg
-            churn_rate = service_churn_total / total_service_counts
+            if weight_col is None:
+                total_service_counts = data.groupby(col, observed=True).size()
+                service_churn_total = (
+                    data.groupby(col, observed=True)[churn_col].apply(lambda x: (x == 1).sum())
+                ) # x == 1, represents 'Churn' == 'Yes'
+                # Compute churn rate, mean applies avg
+                churn_rate = service_churn_total / total_service_counts
+                churn_rate_lower = churn_rate_upper = churn_rate
+                if n_bootstrap:
+                    ci_df = segment_churn_rate_ci(data, col, churn_col, n_replicates=n_bootstrap)
+                    churn_rate_lower, churn_rate_upper = ci_df["ChurnRateLower"], ci_df["ChurnRateUpper"]
+            else:
+                # Population estimates from the stratified sample
+                weighted_df = weighted_churn_rates(data, col, churn_col, weight_col)
+                total_service_counts = weighted_df["TotalCustomers"]
+                service_churn_total = weighted_df["ChurnedCustomers"]
+                churn_rate = weighted_df["ChurnRate"]
+                churn_rate_lower, churn_rate_upper = weighted_df["ChurnRateLower"], weighted_df["ChurnRateUpper"]
             churn_service_summary = pd.DataFrame({
                 "TotalCustomers": total_service_counts,
                 "ChurnedCustomers": service_churn_total,
@@ -84,7 +140,9 @@ def plot_service_vs_churn(df, service_col, churn_col="Churn",eligible_condition=
                     "Service": col,
                     "Status": val,
                     "ChurnedCustomers": service_churn_total[val],
-                    "ChurnRate": churn_rate[val]
+                    "ChurnRate": churn_rate[val],
+                    "ChurnRateLower": churn_rate_lower[val],
+                    "ChurnRateUpper": churn_rate_upper[val]
                 })
 
     service_df = pd.DataFrame(service_list)
@@ -95,10 +153,12 @@ def plot_service_vs_churn(df, service_col, churn_col="Churn",eligible_condition=
 
     # Primary axis: churn rate
     unique_vals = set(service_df["Service"].dropna().unique())
+    service_order = list(dict.fromkeys(service_df["Service"]))
+    status_order = list(dict.fromkeys(service_df["Status"]))
     if (len(unique_vals) > 1):
-        sns.barplot(data=service_df, x="Service", hue="Status", y="ChurnRatePct",palette="Set2")
+        sns.barplot(data=service_df, x="Service", hue="Status", y="ChurnRatePct",palette="Set2", order=service_order, hue_order=status_order)
     else:
-        sns.barplot(data=service_df, x="Status", y="ChurnRatePct",palette="Set2")
+        sns.barplot(data=service_df, x="Status", y="ChurnRatePct",palette="Set2", order=status_order)
     plt.ylim(0, 100)
     # Set y-axis ticks from 0 to 100 at intervals of 10
     plt.yticks(range(0, 101, 10))
@@ -106,8 +166,29 @@ def plot_service_vs_churn(df, service_col, churn_col="Churn",eligible_condition=
     plt.title(title, fontsize=14)
     plt.tight_layout()
 
-    for container in ax1.containers:
-        ax1.bar_label(container, fmt="%.2f%%", padding=3, color="green", fontsize=12)
+    # Snapshot the bar containers, error bars add containers of their own
+    for i, container in enumerate(list(ax1.containers)):
+        if weight_col is None and not n_bootstrap:
+            ax1.bar_label(container, fmt="%.2f%%", padding=3, color="green", fontsize=12)
+        else:
+            # Bars sit at the x position of their category (explicit orders), with several services
+            # there is one container per status
+            intervals = service_df.set_index(["Service", "Status"])[["ChurnRate", "ChurnRateLower", "ChurnRateUpper"]] * 100
+            keys = [
+                (service_order[round(bar.get_x() + bar.get_width() / 2)], status_order[i]) if len(unique_vals) > 1
+                else (service_order[0], status_order[round(bar.get_x() + bar.get_width() / 2)])
+                for bar in container
+            ]
+            bars = [(bar, intervals.loc[key]) for bar, key in zip(container, keys) if key in intervals.index]
+            ax1.errorbar(
+                [bar.get_x() + bar.get_width() / 2 for bar, _ in bars],
+                [row["ChurnRate"] for _, row in bars],
+                yerr=[[row["ChurnRate"] - row["ChurnRateLower"] for _, row in bars],
+                      [row["ChurnRateUpper"] - row["ChurnRate"] for _, row in bars]],
+                fmt="none", ecolor="black", elinewidth=1.5, capsize=6
+            )
+            labels = [f"{row['ChurnRate']:.2f}%\n[{row['ChurnRateLower']:.2f}, {row['ChurnRateUpper']:.2f}]" for _, row in bars]
+            ax1.bar_label(container, labels=labels, padding=3, color="green", fontsize=10)
     
     labels = [tick.get_text() for tick in ax1.get_xticklabels()]
 
@@ -171,7 +252,7 @@ def plot_service_vs_churn(df, service_col, churn_col="Churn",eligible_condition=
     # plt.savefig(save_path, dpi=500, bbox_inches='tight')
     # print(f"{service_col} Plot saved to {save_path}")
 
-def plot_tenure_eda(df, tenure_col="tenure", churn_col="Churn", title=None, save_path='visuals/eda/eval.png'):
+def plot_tenure_eda(df, tenure_col="tenure", churn_col="Churn", title=None, save_path='visuals/eda/eval.png', n_bootstrap=None, weight_col=None):
     """
     Exploratory Data Analysis for tenure.
     Parameters:
@@ -179,13 +260,20 @@ def plot_tenure_eda(df, tenure_col="tenure", churn_col="Churn", title=None, save
     tenure_col(str): Column name for the tenure column
     churn_col(str, default 'Churn'): Column name for churn labels
     save_path(str, default):'visuals/eda': Path to save the plot image
+    n_bootstrap(int, optional): Number of bootstrap replicates for 95% churn rate error bars
+    weight_col(str, optional): Sampling weight column of a stratified sample (from stratified_reservoir_sample),
+    counts and churn rates are then reweighted to the population with 95% sampling error bars
     """
     df = df.sort_values(by=tenure_col, ascending=True)
     # ---------------------------
     # Count plot: churn by tenure
     # ---------------------------
     plt.figure(figsize=(24,8))
-    sns.countplot(data=df, x=tenure_col, palette="Set2")
+    if weight_col is None:
+        sns.countplot(data=df, x=tenure_col, palette="Set2")
+    else:
+        # Population counts: sum of the sampling weights
+        sns.barplot(data=df, x=tenure_col, y=weight_col, estimator="sum", errorbar=None, palette="Set2")
     plt.title(title)
     plt.xlabel(f"{tenure_col}(Months)")
     plt.ylabel("Total Number of Customers")
@@ -206,7 +294,11 @@ def plot_tenure_eda(df, tenure_col="tenure", churn_col="Churn", title=None, save
     df['tenure_group'] = pd.Categorical(df['tenure_group'], categories=ordered_groups, ordered=True)
 
     plt.figure(figsize=(12,8))
-    sns.countplot(data=df, x="tenure_group", palette="Set2")
+    if weight_col is None:
+        sns.countplot(data=df, x="tenure_group", palette="Set2")
+    else:
+        # Population counts: sum of the sampling weights
+        sns.barplot(data=df, x="tenure_group", y=weight_col, estimator="sum", errorbar=None, palette="Set2")
     plt.title(title)
     plt.xlabel(f"{tenure_col}(6 Months Range)")
     plt.ylabel("Total Number of Customers")
@@ -230,10 +322,19 @@ def plot_tenure_eda(df, tenure_col="tenure", churn_col="Churn", title=None, save
         "ChurnedCustomers": tenure_churn_total,
         "ChurnRate": churn_rate
     })
+    if weight_col is not None:
+        # Population estimates from the stratified sample
+        churn_service_summary = weighted_churn_rates(df, "tenure_group", churn_col, weight_col).reindex(churn_rate_by_group.index)
+        churn_rate_by_group = churn_service_summary["ChurnRate"]
     #print(churn_service_summary)
     # --- Plot churn rate ---
     plt.figure(figsize=(12,8))
     ax = sns.barplot(x=churn_rate_by_group.index,y=(churn_rate_by_group.values)*100,palette='Set2')
+    if weight_col is not None:
+        _plot_churn_rate_error_bars(ax, churn_service_summary, scale=100)
+    elif n_bootstrap:
+        ci_df = segment_churn_rate_ci(df, "tenure_group", churn_col, n_replicates=n_bootstrap)
+        _plot_churn_rate_error_bars(ax, ci_df.reindex(churn_rate_by_group.index), scale=100)
     plt.title("Churn Rate by Tenure 6 months Group")
     plt.xlabel("Tenure Group (6 Months)")
     plt.ylabel("Churn Rate")
@@ -249,7 +350,7 @@ def plot_tenure_eda(df, tenure_col="tenure", churn_col="Churn", title=None, save
     print(f"{tenure_col} range Plot saved to {save_path}")
 
 
-def plot_contract_eda(df, contract_col="Contract", churn_col="Churn", title=None, save_path='visuals/eda/eval.png'):
+def plot_contract_eda(df, contract_col="Contract", churn_col="Churn", title=None, save_path='visuals/eda/eval.png', n_bootstrap=None, weight_col=None):
     """
     Exploratory Data Analysis for tenure.
     Parameters:
@@ -257,11 +358,14 @@ def plot_contract_eda(df, contract_col="Contract", churn_col="Churn", title=None
     contract_col(str): Column name for the tenure column
     churn_col(str, default 'Churn'): Column name for churn labels
     save_path(str, default):'visuals/eda': Path to save the plot image
+    n_bootstrap(int, optional): Number of bootstrap replicates for 95% churn rate error bars
+    weight_col(str, optional): Sampling weight column of a stratified sample (from stratified_reservoir_sample),
+    churn rates are then reweighted to the population with 95% sampling error bars
     """
     data = df.copy()
-    total_contract_counts = data.groupby(contract_col).size()
+    total_contract_counts = data.groupby(contract_col, observed=True).size()
     contract_churn_total = (
-        data.groupby(contract_col)[churn_col].apply(lambda x: (x == 1).sum())
+        data.groupby(contract_col, observed=True)[churn_col].apply(lambda x: (x == 1).sum())
         ) # x == 1, represents 'Churn' == 'Yes'
     # Compute churn rate, mean applies avg
     churn_rate = contract_churn_total / total_contract_counts
@@ -270,6 +374,9 @@ def plot_contract_eda(df, contract_col="Contract", churn_col="Churn", title=None
         "ChurnedCustomers": contract_churn_total,
         "ChurnRate": churn_rate
     })
+    if weight_col is not None:
+        # Population estimates from the stratified sample
+        churn_contract_summary = weighted_churn_rates(data, contract_col, churn_col, weight_col)
     #print(churn_contract_summary)
 
     # --- Plot ---
@@ -277,6 +384,11 @@ def plot_contract_eda(df, contract_col="Contract", churn_col="Churn", title=None
 
     # Primary axis: churn rate
     sns.barplot(x=churn_contract_summary.index, y=churn_contract_summary["ChurnRate"],palette="Set2",ax=ax1)
+    if weight_col is not None:
+        _plot_churn_rate_error_bars(ax1, churn_contract_summary)
+    elif n_bootstrap:
+        ci_df = segment_churn_rate_ci(data, contract_col, churn_col, n_replicates=n_bootstrap)
+        _plot_churn_rate_error_bars(ax1, ci_df.reindex(churn_contract_summary.index))
     ax1.set_ylim(0, 1)
     ax1.set_ylabel("Churn Rate", color="green", fontsize=12)
     ax1.set_xlabel(f"{contract_col} (0 = No, 1 = Yes)")
@@ -290,4 +402,41 @@ def plot_contract_eda(df, contract_col="Contract", churn_col="Churn", title=None
     os.makedirs(os.path.dirname(save_path), exist_ok=True) 
     # --- Save plot ---
     plt.savefig(save_path, dpi=500, bbox_inches='tight')
-    print(f"{contract_col} Plot saved to {save_path}")
\ No newline at end of file
+    print(f"{contract_col} Plot saved to {save_path}")
+
+def plot_survival_curves(survival_df, segment_col="Contract", tenure_col="tenure", title=None, save_path='visuals/eda/eval.png'):
+    """
+    Plots Kaplan-Meier retention curves with confidence bands for one segment column.
+    Parameters:
+    survival_df(pd.DataFrame): Output of create_survival_table
+    segment_col(str, default 'Contract'): Segment column whose curves are drawn
+    tenure_col(str, default 'tenure'): Column name for the tenure column
+    title(str): Title of the visual
+    save_path(str, default):'visuals/eda': Path to save the plot image
+    """
+    data = survival_df[survival_df["SegmentColumn"] == segment_col]
+    if data.empty:
+        raise ValueError(f"No survival curves found for segment column '{segment_col}'.")
+
+    # --- Plot ---
+    fig, ax1 = plt.subplots(figsize=(12,8))
+    colors = sns.color_palette("Set2", data["Segment"].nunique())
+
+    for color, (segment, curve) in zip(colors, data.groupby("Segment", sort=True)):
+        ax1.step(curve[tenure_col], curve["Survival"] * 100, where="post", color=color, linewidth=2, label=segment)
+        ax1.fill_between(curve[tenure_col], curve["SurvivalLower"] * 100, curve["SurvivalUpper"] * 100,
+                         step="post", color=color, alpha=0.25)
+
+    ax1.set_ylim(0, 100)
+    ax1.set_xlabel(f"{tenure_col}(Months)", fontsize=14)
+    ax1.set_ylabel("Customers Retained (%)", color="green", fontsize=14)
+    ax1.set_title(title, fontsize=14)
+    ax1.grid(True, linestyle='--', alpha=0.5)
+    ax1.legend(title=segment_col)
+    plt.tight_layout()
+
+    # --- Create folder if it doesn't exist ---
+    os.makedirs(os.path.dirname(save_path), exist_ok=True)
+    # --- Save plot ---
+    plt.savefig(save_path, dpi=500, bbox_inches='tight')
+    print(f"{segment_col} Survival Plot saved to {save_path}")
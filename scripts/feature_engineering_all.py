@@ -10,13 +10,15 @@ import os
 import seaborn as sns
 import matplotlib.pyplot as plt
 
-from src.feature_engineering import create_tenure_lifecycle_features, create_pricing_features, create_service_engagement_features,create_household_demographic_features, create_contract_payment_features
+from src.feature_engineering import compute_feature_statistics, create_tenure_lifecycle_features, create_pricing_features, create_service_engagement_features,create_household_demographic_features, create_contract_payment_features
 
-def create_all_features(df):
+def create_all_features(df, feature_stats=None):
     """
     Apply all feature engineering functions and return a combined dataframe.
     Parameters:
     df(pd.DataFrame): customer dataset
+    feature_stats(dict, optional): training statistics from compute_feature_statistics,
+    computed from df when not given (pass the training values when scoring)
     
     Returns:
     df(pd.DataFrame): with all features added
@@ -24,21 +26,23 @@ def create_all_features(df):
     df = df.copy()
     sheet_names = []
     feature_cols = []
+    if feature_stats is None:
+        feature_stats = compute_feature_statistics(df)
     
     # --- Tenure & Customer Lifecycle ---
-    df_lifecycle_features = create_tenure_lifecycle_features(df)
+    df_lifecycle_features = create_tenure_lifecycle_features(df, max_tenure=feature_stats["max_tenure"])
     sheet_names.append("Lifecycle Features")
     lifecycle_cols = list(set(df_lifecycle_features.columns))
     feature_cols.append(lifecycle_cols)
 
     # Pricing
-    df_financial_features = create_pricing_features(df_lifecycle_features)
+    df_financial_features = create_pricing_features(df_lifecycle_features, median_monthly_charge=feature_stats["median_monthly_charge"])
     sheet_names.append("Financial Features")
     financial_cols = list(set(df_financial_features.columns) - set(df_lifecycle_features.columns))
     feature_cols.append(financial_cols)
 
     # --- Service Usage & Engagement ---
-    df_service_usage_features = create_service_engagement_features(df_financial_features)
+    df_service_usage_features = create_service_engagement_features(df_financial_features, median_monthly_charge=feature_stats["median_monthly_charge"])
     sheet_names.append("Service_Usage Features")
     service_cols = list(set(df_service_usage_features.columns) - set(df_financial_features.columns))
     feature_cols.append(service_cols)
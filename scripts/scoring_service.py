@@ -0,0 +1,266 @@
+"""
+Online Churn Scoring Service
+- asyncio HTTP server (standard library only) accepting raw customer records
+- Concurrent requests are gathered into micro-batches within a latency window
+- Each batch is cleaned, feature engineered and scored vectorized with the saved model
+
+Endpoints:
+POST /score   body: one customer record (JSON object) or a list of records
+GET  /health
+
+Usage:
+python scripts/scoring_service.py --model ./models/churn_logistic_regression.joblib --port 8080
+"""
+import sys
+import json
+import asyncio
+import argparse
+from pathlib import Path
+
+# Add project root to Python path
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.append(str(PROJECT_ROOT))
+
+import pandas as pd
+
+from src.modeling import load_model, predict_churn_proba
+from batch_scoring import prepare_scoring_features
+
+# Raw input columns of the dataset, Churn is not needed to score
+INPUT_COLUMNS = [
+    "customerID", "gender", "SeniorCitizen", "Partner", "Dependents", "tenure",
+    "PhoneService", "MultipleLines", "InternetService", "OnlineSecurity", "OnlineBackup",
+    "DeviceProtection", "TechSupport", "StreamingTV", "StreamingMovies", "Contract",
+    "PaperlessBilling", "PaymentMethod", "MonthlyCharges", "TotalCharges"
+]
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+
+def create_scoring_state(model_bundle, max_batch_size=256, max_wait_ms=5.0):
+    """
+    Create the shared state of the scoring service.
+    Parameters:
+    model_bundle(dict): Output of fit_final_model / load_model
+    max_batch_size(int, default 256): Largest number of records scored in one batch
+    max_wait_ms(float, default 5.0): Longest time the first record of a batch waits for others
+
+    Returns:
+    state(dict): model bundle, batching settings, request queue and batch statistics
+    """
+    if max_batch_size < 1:
+        raise ValueError("max_batch_size must be at least 1.")
+    return {
+        "model_bundle": model_bundle,
+        "max_batch_size": max_batch_size,
+        "max_wait": max_wait_ms / 1000,
+        "queue": asyncio.Queue(),
+        "n_batches": 0,
+        "n_records": 0
+    }
+
+
+def _score_batch(model_bundle, records):
+    """Score a list of raw records in one vectorized pass."""
+    features = prepare_scoring_features(pd.DataFrame.from_records(records), model_bundle)
+    return predict_churn_proba(model_bundle, features).tolist()
+
+
+def _score_records_one_by_one(model_bundle, records):
+    """Score records separately, returning (score, error) pairs so a bad record only fails itself."""
+    results = []
+    for record in records:
+        try:
+            results.append((_score_batch(model_bundle, [record])[0], None))
+        except Exception as error:
+            results.append((None, error))
+    return results
+
+
+async def batch_worker(state):
+    """
+    Gather queued records into micro-batches and resolve each record's future with its score.
+    A batch closes when it reaches max_batch_size or max_wait after its first record arrived.
+    """
+    loop = asyncio.get_running_loop()
+    queue = state["queue"]
+
+    while True:
+        batch = [await queue.get()]
+        # Take the records already waiting first, so batches grow with the load and not only with the window
+        while len(batch) < state["max_batch_size"] and not queue.empty():
+            batch.append(queue.get_nowait())
+        deadline = loop.time() + state["max_wait"]
+        while len(batch) < state["max_batch_size"]:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        records = [record for record, _ in batch]
+        try:
+            # Run the vectorized scoring off the event loop so new requests keep queuing
+            scores = await loop.run_in_executor(None, _score_batch, state["model_bundle"], records)
+            results = [(score, None) for score in scores]
+        except Exception:
+            # One bad record must not fail the whole batch, score records one by one (also off the event loop)
+            results = await loop.run_in_executor(None, _score_records_one_by_one, state["model_bundle"], records)
+
+        for (_, future), (score, error) in zip(batch, results):
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(score)
+            else:
+                future.set_exception(error)
+
+        state["n_batches"] += 1
+        state["n_records"] += len(batch)
+
+
+async def score_records(state, records):
+    """
+    Queue raw customer records for scoring and wait for their churn probabilities.
+    Parameters:
+    state(dict): Output of create_scoring_state
+    records(list): raw customer records (dicts with the INPUT_COLUMNS, numbers may be sent as text)
+
+    Returns:
+    scores(list): churn probability of every record
+    """
+    for record in records:
+        missing_cols = [col for col in INPUT_COLUMNS if col not in record]
+        if missing_cols:
+            raise ValueError(f"Customer record is missing columns: {missing_cols}")
+
+    loop = asyncio.get_running_loop()
+    futures = []
+    for record in records:
+        future = loop.create_future()
+        state["queue"].put_nowait((record, future))
+        futures.append(future)
+    return list(await asyncio.gather(*futures))
+
+
+async def _read_request(reader):
+    """Read one HTTP/1.1 request, returns (method, path, headers, body) or None at end of stream."""
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return method, path, headers, body
+
+
+def _write_response(writer, status, payload, keep_alive):
+    """Write a JSON HTTP/1.1 response."""
+    body = json.dumps(payload).encode("utf-8")
+    head = (
+        f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode("latin-1") + body)
+
+
+async def handle_connection(state, reader, writer):
+    """Serve the requests of one client connection (keep-alive supported)."""
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except (ValueError, asyncio.IncompleteReadError):
+                _write_response(writer, 400, {"error": "Malformed HTTP request"}, keep_alive=False)
+                break
+            if request is None:
+                break
+
+            method, path, headers, body = request
+            keep_alive = headers.get("connection", "keep-alive").lower() != "close"
+
+            if path == "/health":
+                status, payload = 200, {"status": "ok", "batches": state["n_batches"], "records": state["n_records"]}
+            elif path != "/score":
+                status, payload = 404, {"error": f"Unknown path {path}"}
+            elif method != "POST":
+                status, payload = 405, {"error": "Use POST to score customers"}
+            else:
+                try:
+                    data = json.loads(body)
+                    records = data if isinstance(data, list) else [data]
+                    scores = await score_records(state, records)
+                    customer_ids = [record["customerID"] for record in records]
+                    if isinstance(data, list):
+                        payload = [{"customerID": c, "churn_probability": s} for c, s in zip(customer_ids, scores)]
+                    else:
+                        payload = {"customerID": customer_ids[0], "churn_probability": scores[0]}
+                    status = 200
+                except (ValueError, KeyError, TypeError) as error:
+                    status, payload = 400, {"error": str(error)}
+                except Exception as error:
+                    status, payload = 500, {"error": str(error)}
+
+            _write_response(writer, status, payload, keep_alive)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def start_scoring_server(model_bundle, host="127.0.0.1", port=8080, max_batch_size=256, max_wait_ms=5.0):
+    """
+    Start the scoring server and its batch worker on the running event loop.
+    Parameters:
+    model_bundle(dict): Output of fit_final_model / load_model
+    host(str, default '127.0.0.1'): Interface to listen on
+    port(int, default 8080): Port to listen on, 0 picks a free port
+    max_batch_size(int, default 256): Largest number of records scored in one batch
+    max_wait_ms(float, default 5.0): Micro-batching latency window in milliseconds
+
+    Returns:
+    server(asyncio.Server): the listening server
+    state(dict): service state, 'worker' holds the batch worker task
+    """
+    state = create_scoring_state(model_bundle, max_batch_size, max_wait_ms)
+    state["worker"] = asyncio.create_task(batch_worker(state))
+    server = await asyncio.start_server(lambda r, w: handle_connection(state, r, w), host, port)
+    return server, state
+
+""" # EXAMPLE USAGE
+server, state = await start_scoring_server(load_model(MODEL_PATH), port=0)
+port = server.sockets[0].getsockname()[1] """
+
+
+async def _serve(args):
+    server, state = await start_scoring_server(
+        load_model(args.model), args.host, args.port, args.max_batch_size, args.max_wait_ms
+    )
+    print(f"Churn scoring service listening on http://{args.host}:{args.port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve churn probabilities for raw customer records over HTTP.")
+    parser.add_argument("--model", default="./models/churn_logistic_regression.joblib", help="model saved by churn_main.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--max-batch-size", type=int, default=256, help="largest micro-batch")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0, help="micro-batching latency window")
+    asyncio.run(_serve(parser.parse_args()))
@@ -0,0 +1,225 @@
+import os
+import json
+import pandas as pd
+import numpy as np
+from scipy.stats import chi2_contingency, kstwobign
+
+# PSI rule of thumb: below 0.1 stable, 0.1 to 0.25 moderate shift, above 0.25 major shift
+PSI_MODERATE = 0.1
+PSI_MAJOR = 0.25
+
+
+def _new_feature_profile(series, reference=None, n_bins=100, max_categories=20):
+    """Start the profile of one feature, fixing its kind and bin edges from the reference or the first chunk."""
+    if reference is not None:
+        kind = reference["kind"]
+    elif not pd.api.types.is_numeric_dtype(series) or (
+        not pd.api.types.is_float_dtype(series) and series.nunique(dropna=True) <= max_categories
+    ):
+        # Text columns and low-cardinality integer codes and flags are compared as categories
+        kind = "categorical"
+    else:
+        kind = "numeric"
+
+    profile = {"kind": kind, "count": 0, "missing": 0}
+    if kind == "categorical":
+        profile["categories"] = {}
+        return profile
+
+    if reference is not None:
+        edges = reference["edges"]
+    else:
+        # Interior edges at the quantiles of the first chunk, the outer bins are open-ended
+        edges = np.unique(np.nanquantile(series.to_numpy(dtype=np.float64), np.linspace(0, 1, n_bins + 1)[1:-1])).tolist()
+    profile.update({
+        "edges": edges,
+        "histogram": [0] * (len(edges) + 1),
+        "sum": 0.0,
+        "sum_sq": 0.0,
+        "min": None,
+        "max": None
+    })
+    return profile
+
+
+def _update_feature_profile(profile, series):
+    """Add one chunk of a feature to its profile."""
+    missing = series.isna()
+    profile["count"] += int((~missing).sum())
+    profile["missing"] += int(missing.sum())
+    values = series[~missing]
+
+    if profile["kind"] == "categorical":
+        for value, count in values.astype(str).value_counts().items():
+            profile["categories"][value] = profile["categories"].get(value, 0) + int(count)
+        return
+
+    values = values.to_numpy(dtype=np.float64)
+    if len(values) == 0:
+        return
+    bins = np.searchsorted(profile["edges"], values, side="right")
+    profile["histogram"] = (np.asarray(profile["histogram"]) + np.bincount(bins, minlength=len(profile["histogram"]))).tolist()
+    profile["sum"] += float(values.sum())
+    profile["sum_sq"] += float(np.square(values).sum())
+    profile["min"] = float(values.min()) if profile["min"] is None else min(profile["min"], float(values.min()))
+    profile["max"] = float(values.max()) if profile["max"] is None else max(profile["max"], float(values.max()))
+
+
+def build_feature_profile(chunks, feature_cols=None, reference_profile=None, snapshot=None, n_bins=100, max_categories=20):
+    """
+    Build fixed-bin histograms (numeric features) and category counts (categorical and flag
+    features) of a snapshot in a single streaming pass.
+    Parameters:
+    chunks(pd.DataFrame/iterable): the snapshot, or an iterator of chunks such as pd.read_csv(..., chunksize=...)
+    feature_cols(list, optional): Features to profile, defaults to the reference features or all columns
+    reference_profile(dict, optional): Profile whose feature kinds and bin edges are reused so the
+        snapshots can be compared. Without it, edges are the first chunk's quantiles
+    snapshot(str, optional): Label of the snapshot (e.g. its extract date)
+    n_bins(int, default 100): Number of histogram bins of numeric features
+    max_categories(int, default 20): Integer features with at most this many values are treated as categories
+
+    Returns:
+    profile(dict): 'snapshot', 'n_rows' and per-feature sketches under 'features'
+    """
+    if isinstance(chunks, pd.DataFrame):
+        chunks = [chunks]
+    if feature_cols is None and reference_profile is not None:
+        feature_cols = list(reference_profile["features"])
+
+    profile = {"snapshot": snapshot, "n_rows": 0, "features": {}}
+    for chunk in chunks:
+        cols = list(chunk.columns) if feature_cols is None else feature_cols
+        for col in cols:
+            if col not in chunk.columns:
+                raise KeyError(f"Feature '{col}' not found in snapshot.")
+            if col not in profile["features"]:
+                reference = None if reference_profile is None else reference_profile["features"].get(col)
+                profile["features"][col] = _new_feature_profile(chunk[col], reference, n_bins, max_categories)
+            _update_feature_profile(profile["features"][col], chunk[col])
+        profile["n_rows"] += len(chunk)
+
+    print(f"Profiled {len(profile['features'])} features over {profile['n_rows']} rows.")
+    return profile
+
+""" # EXAMPLE USAGE
+reference_profile = build_feature_profile(pd.read_csv(REFERENCE_FEATURES_PATH, chunksize=100_000), feature_cols)
+current_profile = build_feature_profile(pd.read_csv(NEW_FEATURES_PATH, chunksize=100_000), reference_profile=reference_profile) """
+
+
+def save_profile(profile, path):
+    """Save a feature profile to JSON"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(profile, f)
+    print(f"Feature profile saved to: {path}")
+
+
+def load_profile(path):
+    """Load a feature profile saved with save_profile"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Feature profile not found at: {path}")
+    with open(path) as f:
+        return json.load(f)
+
+
+def _psi(reference_counts, current_counts, epsilon=1e-6):
+    """Population stability index between two count vectors over the same bins."""
+    reference_share = np.maximum(reference_counts / max(reference_counts.sum(), 1), epsilon)
+    current_share = np.maximum(current_counts / max(current_counts.sum(), 1), epsilon)
+    return float(np.sum((current_share - reference_share) * np.log(current_share / reference_share)))
+
+
+def _compare_numeric(reference, current, psi_bins):
+    """PSI over reference-quantile groups of the fine bins and two-sample KS on the binned CDFs."""
+    if reference["edges"] != current["edges"]:
+        raise ValueError("Numeric profiles must share bin edges, build the current profile with reference_profile.")
+    reference_counts = np.asarray(reference["histogram"], dtype=np.float64)
+    current_counts = np.asarray(current["histogram"], dtype=np.float64)
+    n_reference, n_current = reference_counts.sum(), current_counts.sum()
+
+    # Merge fine bins into groups of about 1/psi_bins of the reference each
+    reference_cdf = np.cumsum(reference_counts) / max(n_reference, 1)
+    groups = np.minimum((reference_cdf * psi_bins - 1e-9).astype(int), psi_bins - 1)
+    groups = np.concatenate([[0], groups[:-1]])
+    psi = _psi(np.bincount(groups, reference_counts), np.bincount(groups, current_counts))
+
+    ks_statistic = float(np.max(np.abs(reference_cdf - np.cumsum(current_counts) / max(n_current, 1))))
+    effective_n = n_reference * n_current / max(n_reference + n_current, 1)
+    ks_pvalue = float(kstwobign.sf(ks_statistic * np.sqrt(effective_n)))
+    return psi, ks_statistic, ks_pvalue
+
+
+def _compare_categorical(reference, current):
+    """PSI and chi-square test of homogeneity over the union of categories."""
+    categories = sorted(set(reference["categories"]) | set(current["categories"]))
+    reference_counts = np.array([reference["categories"].get(c, 0) for c in categories], dtype=np.float64)
+    current_counts = np.array([current["categories"].get(c, 0) for c in categories], dtype=np.float64)
+
+    psi = _psi(reference_counts, current_counts)
+    if len(categories) < 2:
+        return psi, 0.0, 1.0
+    chi2_statistic, chi2_pvalue, _, _ = chi2_contingency(np.vstack([reference_counts, current_counts]))
+    return psi, float(chi2_statistic), float(chi2_pvalue)
+
+
+def compare_profiles(reference_profile, current_profile, psi_bins=10):
+    """
+    Drift report of a snapshot against a reference snapshot, computed from their profiles only.
+    Parameters:
+    reference_profile(dict): Profile of the reference snapshot
+    current_profile(dict): Profile of the new snapshot, built with reference_profile
+    psi_bins(int, default 10): Number of reference-quantile groups numeric PSI is computed over
+
+    Returns:
+    drift_df(pd.DataFrame): per feature PSI, KS statistic and p-value (numeric), chi-square statistic
+    and p-value (categorical), reference and current mean and a DriftStatus, largest PSI first
+    """
+    rows = []
+    for col, reference in reference_profile["features"].items():
+        if col not in current_profile["features"]:
+            raise KeyError(f"Feature '{col}' missing from the current profile.")
+        current = current_profile["features"][col]
+        row = {"Feature": col, "Kind": reference["kind"]}
+
+        if reference["kind"] == "numeric":
+            row["PSI"], row["KSStatistic"], row["KSPValue"] = _compare_numeric(reference, current, psi_bins)
+            row["ReferenceMean"] = reference["sum"] / max(reference["count"], 1)
+            row["CurrentMean"] = current["sum"] / max(current["count"], 1)
+        else:
+            row["PSI"], row["Chi2Statistic"], row["Chi2PValue"] = _compare_categorical(reference, current)
+
+        row["DriftStatus"] = "major" if row["PSI"] >= PSI_MAJOR else "moderate" if row["PSI"] >= PSI_MODERATE else "stable"
+        rows.append(row)
+
+    columns = ["Feature", "Kind", "PSI", "KSStatistic", "KSPValue", "Chi2Statistic", "Chi2PValue",
+               "ReferenceMean", "CurrentMean", "DriftStatus"]
+    drift_df = pd.DataFrame(rows).reindex(columns=columns)
+    return drift_df.sort_values(by="PSI", ascending=False).reset_index(drop=True)
+
+""" # EXAMPLE USAGE
+drift_df = compare_profiles(reference_profile, current_profile) """
+
+
+def drift_gate(drift_df, psi_threshold=PSI_MAJOR, ks_threshold=0.1):
+    """
+    Decide whether drift is large enough to retrain the model.
+    P-values are reported but not gated on, with millions of rows they flag negligible shifts.
+    Parameters:
+    drift_df(pd.DataFrame): Output of compare_profiles
+    psi_threshold(float, default 0.25): PSI at or above which a feature counts as drifted
+    ks_threshold(float, default 0.1): KS statistic at or above which a numeric feature counts as drifted
+
+    Returns:
+    retrain(bool): True when at least one feature drifted
+    drifted_features(list): names of the drifted features
+    """
+    drifted = (drift_df["PSI"] >= psi_threshold) | (drift_df["KSStatistic"].fillna(0) >= ks_threshold)
+    drifted_features = drift_df.loc[drifted, "Feature"].tolist()
+    if drifted_features:
+        print(f"Drift detected, retraining recommended. Drifted features: {drifted_features}")
+    else:
+        print("No significant drift detected.")
+    return bool(drifted_features), drifted_features
+
+""" # EXAMPLE USAGE
+retrain, drifted_features = drift_gate(drift_df, psi_threshold=0.25) """
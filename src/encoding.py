@@ -0,0 +1,112 @@
+import os
+import json
+import pandas as pd
+import numpy as np
+
+
+def fit_category_vocabulary(df, columns=None, max_categories=50):
+    """
+    Fix the categories of every categorical column, so that training and scoring data
+    get the same integer codes.
+    Parameters:
+    df(pd.DataFrame): cleaned training dataset
+    columns(list, optional): Columns to encode. Defaults to every text column with at most
+        `max_categories` distinct values (identifiers such as customerID are left as text)
+    max_categories(int, default 50): Highest number of distinct values for a column to be encoded
+
+    Returns:
+    vocabulary(dict): {column: sorted list of categories}, code i is vocabulary[column][i]
+    """
+    if columns is None:
+        columns = [
+            col for col in df.columns
+            if (df[col].dtype == "object" or isinstance(df[col].dtype, pd.CategoricalDtype))
+            and df[col].nunique(dropna=True) <= max_categories
+        ]
+
+    vocabulary = {}
+    for col in columns:
+        if col not in df.columns:
+            raise KeyError(f"Column '{col}' not found in DataFrame.")
+        vocabulary[col] = sorted(str(value) for value in df[col].dropna().unique())
+    return vocabulary
+
+""" # EXAMPLE USAGE
+vocabulary = fit_category_vocabulary(filled_total_charges_df) """
+
+
+def encode_categorical_columns(df, vocabulary, verbose=True):
+    """
+    Convert the vocabulary columns to pd.Categorical with the fixed categories, stored as
+    int8/int16 codes. Values not in the vocabulary (new categories at scoring time) get
+    code -1, they behave as missing and match no category.
+    Parameters:
+    df(pd.DataFrame): cleaned dataset
+    vocabulary(dict): Output of fit_category_vocabulary
+    verbose(bool, default True): Print the encoded columns and unseen values
+
+    Returns:
+    encoded_df(pd.DataFrame): copy of df with the categorical columns encoded
+    """
+    encoded_df = df.copy()
+    for col, categories in vocabulary.items():
+        if col not in encoded_df.columns:
+            raise KeyError(f"Column '{col}' not found in DataFrame.")
+        values = encoded_df[col].astype(str).where(encoded_df[col].notna())
+        encoded_df[col] = pd.Categorical(values, categories=categories)
+
+        unseen = encoded_df[col].isna() & values.notna()
+        if unseen.any():
+            print(f"Warning: {int(unseen.sum())} values of '{col}' not in the vocabulary, encoded as -1: "
+                  f"{sorted(values[unseen].unique())[:10]}")
+
+    if verbose:
+        print(f"Encoded {len(vocabulary)} categorical columns as integer codes: {list(vocabulary)}")
+    return encoded_df
+
+""" # EXAMPLE USAGE
+encoded_df = encode_categorical_columns(filled_total_charges_df, vocabulary) """
+
+
+def category_mask(series, values):
+    """
+    Boolean mask of the rows whose value is one of `values`. On encoded columns the values
+    are looked up once in the categories and the rows are compared as integer codes.
+    Parameters:
+    series(pd.Series): encoded (categorical) or text column
+    values(str/list): category or list of categories to match
+
+    Returns:
+    mask(pd.Series): boolean mask aligned with series
+    """
+    values = [values] if isinstance(values, str) else list(values)
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return series.isin(values)
+
+    codes = series.cat.categories.get_indexer(values)
+    codes = codes[codes >= 0]
+    row_codes = series.cat.codes.to_numpy()
+    if len(codes) == 1:
+        mask = row_codes == codes[0]
+    else:
+        mask = np.isin(row_codes, codes)
+    return pd.Series(mask, index=series.index)
+
+""" # EXAMPLE USAGE
+fiber_mask = category_mask(df["InternetService"], "Fiber optic") """
+
+
+def save_vocabulary(vocabulary, path):
+    """Save a category vocabulary to JSON"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(vocabulary, f, indent=2)
+    print(f"Category vocabulary saved to: {path}")
+
+
+def load_vocabulary(path):
+    """Load a category vocabulary saved with save_vocabulary"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Category vocabulary not found at: {path}")
+    with open(path) as f:
+        return json.load(f)
@@ -1,12 +1,33 @@
 import pandas as pd
 import numpy as np
 
-def create_tenure_lifecycle_features(df):
+from src.encoding import category_mask
+
+def compute_feature_statistics(df):
+    """
+    Compute the dataset-level statistics the feature functions depend on, so that
+    scoring data can be transformed with the training-time values.
+    Parameters:
+    df(pd.DataFrame): training customer dataset
+
+    Returns:
+    feature_stats(dict): 'max_tenure' and 'median_monthly_charge'
+    """
+    return {
+        "max_tenure": float(df["tenure"].max()),
+        "median_monthly_charge": float(df["MonthlyCharges"].median())
+    }
+
+""" # EXAMPLE USAGE
+feature_stats = compute_feature_statistics(df) """
+
+def create_tenure_lifecycle_features(df, max_tenure=None):
     """
     Create tenure and customer lifecycle related features.
     Assumes tenure is in months.
     Parameters:
     df(pd.DataFrame): DataFrame containing the data
+    max_tenure(float, optional): tenure used to normalize, defaults to the maximum in df
     """
 
     df = df.copy()
@@ -31,7 +52,9 @@ def create_tenure_lifecycle_features(df):
 
     # Normalize tenure (useful for linear models): rescales tenure values so that all values fall between 0 and 1
     # tenure of 2 months = 2/72, 72 is maximum tenure in data
-    df["tenure_normalized"] = df["tenure"] / df["tenure"].max()
+    if max_tenure is None:
+        max_tenure = df["tenure"].max()
+    df["tenure_normalized"] = df["tenure"] / max_tenure
 
     # Average monthly spend (guard against division by zero), if tenure == 0, no division, default to MonthlyChrges
     df["avg_monthly_spend"] = np.where(
@@ -50,13 +73,14 @@ df_lifecycle_features = create_tenure_lifecycle_features(df)
 """
 
 
-def create_pricing_features(df, avg_monthly_spend_col="avg_monthly_spend"):
+def create_pricing_features(df, avg_monthly_spend_col="avg_monthly_spend", median_monthly_charge=None):
     """
     Create pricing and financial features for churn prediction.
     
     Parameters:
     df(pd.DataFrame):customer dataset
     avg_monthly_spend_col: name of precomputed average monthly spend column
+    median_monthly_charge(float, optional): high charge threshold, defaults to the median in df
     
     Returns:
     df(pd.DataFrame): with added pricing/financial features
@@ -64,27 +88,29 @@ def create_pricing_features(df, avg_monthly_spend_col="avg_monthly_spend"):
     df = df.copy()
     
     # High monthly charge flag (above median), 1 if MonthlyCharges above median, else 0
-    median_monthly_charge = df["MonthlyCharges"].median()
+    if median_monthly_charge is None:
+        median_monthly_charge = df["MonthlyCharges"].median()
     df["high_monthly_charge_flag"] = (df["MonthlyCharges"] > median_monthly_charge).astype(int)
     
     # Monthly vs average spend ratio (to detect sudden increases), sudden price jumps if > 1
     df["monthly_vs_avg_ratio"] = df["MonthlyCharges"] / df[avg_monthly_spend_col]
     
     # Replace inf or NaN if avg_monthly_spend was 0
-    df["monthly_vs_avg_ratio"].replace([float("inf"), -float("inf")], 0, inplace=True)
-    df["monthly_vs_avg_ratio"].fillna(0, inplace=True)
+    df["monthly_vs_avg_ratio"] = df["monthly_vs_avg_ratio"].replace([float("inf"), -float("inf")], 0)
+    df["monthly_vs_avg_ratio"] = df["monthly_vs_avg_ratio"].fillna(0)
     
     return df
 
 """ #EXAMPLE USAGE
 df_financial_features = create_pricing_features(df, avg_monthly_spend_col="avg_monthly_spend") """
 
-def create_service_engagement_features(df):
+def create_service_engagement_features(df, median_monthly_charge=None):
     """
     Create service usage and engagement features, including fiber-optic internet risks.
     
     Parameters:
     df(pd.DataFrame): customer dataset
+    median_monthly_charge(float, optional): high charge threshold, defaults to the median in df
     
     Returns:
     df(pd.DataFrame): with added service/engagement features
@@ -100,14 +126,15 @@ def create_service_engagement_features(df):
     yes_no_cols = service_cols + addon_cols + streaming_cols
     yes_no_cols.remove("InternetService")  # remove it
 
+    # Text or encoded (categorical) columns, e.g. 'No internet service' kept them from the 1/0 conversion
     for col in yes_no_cols:
-        if col in df.columns and df[col].dtype == "object":
-            df[col + "_num"] = df[col].apply(lambda x: 1 if x == "Yes" else 0)
+        if col in df.columns and (df[col].dtype == "object" or isinstance(df[col].dtype, pd.CategoricalDtype)):
+            df[col + "_num"] = category_mask(df[col], "Yes").astype(int)
     
     # Total number of active services (excluding InternetService=No)
     df["num_active_services"] = df[["PhoneService", "MultipleLines_num"]].sum(axis=1)
     # Count InternetService as active if not 'No'
-    df["num_active_services"] += (df["InternetService"] != "No").astype(int)
+    df["num_active_services"] += (~category_mask(df["InternetService"], "No")).astype(int)
     
     # Total number of add-ons
     df["num_active_addons"] = df[[col + "_num" for col in addon_cols]].sum(axis=1)
@@ -120,9 +147,10 @@ def create_service_engagement_features(df):
     df["num_active_internet_services"] = df[internet_services_cols].sum(axis=1)
         
     # Fiber optics specific features
-    fiber_mask = df["InternetService"] == "Fiber optic"
+    fiber_mask = category_mask(df["InternetService"], "Fiber optic")
 
-    median_monthly_charge = df["MonthlyCharges"].median()
+    if median_monthly_charge is None:
+        median_monthly_charge = df["MonthlyCharges"].median()
     
     # If fiber_customer, 1 else 0
     df["fiber_customer_flag"] = fiber_mask.astype(int)
@@ -166,12 +194,13 @@ def create_household_demographic_features(df):
     
     # Gender flag (can be used if relevant)
     if "gender" in df.columns:
-        df["gender_flag"] = df["gender"].apply(lambda x: 1 if x == "Male" else 0)
+        df["gender_flag"] = category_mask(df["gender"], "Male").astype(int)
         # Males with dependents
         df['male_with_dependents'] = ((df['gender_flag']==1) & (df['household_size']>1)).astype(int)
 
-        # Check churn rate for this group
-        churn_rate = df[df['male_with_dependents']==1]['Churn'].mean()
+        # Check churn rate for this group (scoring data has no Churn column)
+        if 'Churn' in df.columns:
+            churn_rate = df[df['male_with_dependents']==1]['Churn'].mean()
         #print(f"Churn rate for males with dependents: {churn_rate:.2%}")
 
     return df
@@ -196,15 +225,16 @@ def create_contract_payment_features(df):
     
     # Contract type flags
     if "Contract" in df.columns:
-        df["is_month_to_month"] = (df["Contract"] == "Month-to-month").astype(int)
-        df["is_one_year_contract"] = (df["Contract"] == "One year").astype(int)
-        df["is_two_year_contract"] = (df["Contract"] == "Two year").astype(int)
+        df["is_month_to_month"] = category_mask(df["Contract"], "Month-to-month").astype(int)
+        df["is_one_year_contract"] = category_mask(df["Contract"], "One year").astype(int)
+        df["is_two_year_contract"] = category_mask(df["Contract"], "Two year").astype(int)
     
     # Payment method flags
     if "PaymentMethod" in df.columns:
         auto_methods = ["Credit card (automatic)", "Bank transfer (automatic)"]
-        df["payment_auto_flag"] = df["PaymentMethod"].isin(auto_methods).astype(int)
-        df["payment_manual_flag"] = (~df["PaymentMethod"].isin(auto_methods)).astype(int)
+        auto_mask = category_mask(df["PaymentMethod"], auto_methods)
+        df["payment_auto_flag"] = auto_mask.astype(int)
+        df["payment_manual_flag"] = (~auto_mask).astype(int)
     
     return df
 
@@ -0,0 +1,323 @@
+import os
+import json
+import math
+import itertools
+import joblib
+import pandas as pd
+import numpy as np
+import sklearn
+from joblib import Parallel, delayed
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import StratifiedKFold
+
+# 'penalty' is deprecated from scikit-learn 1.8, the penalty is set through l1_ratio instead
+_SKLEARN_VERSION = tuple(int(part) for part in sklearn.__version__.split(".")[:2])
+_PENALTY_L1_RATIO = {"l2": 0.0, "l1": 1.0}
+
+DEFAULT_PARAM_GRID = {
+    "C": [0.001, 0.003, 0.01, 0.03, 0.1, 0.3, 1.0, 3.0, 10.0, 30.0, 100.0],
+    "penalty": ["l2", "l1"],
+    "class_weight": [None, "balanced"]
+}
+
+
+def _make_logistic_regression(C, penalty, class_weight, max_iter=1000):
+    """Create a warm-startable LogisticRegression for the given penalty name."""
+    if penalty not in _PENALTY_L1_RATIO:
+        raise ValueError(f"Unsupported penalty '{penalty}'. Use one of {list(_PENALTY_L1_RATIO)}.")
+
+    solver = "lbfgs" if penalty == "l2" else "saga"
+    if _SKLEARN_VERSION >= (1, 8):
+        return LogisticRegression(C=C, l1_ratio=_PENALTY_L1_RATIO[penalty], solver=solver,
+                                  class_weight=class_weight, max_iter=max_iter, warm_start=True)
+    return LogisticRegression(C=C, penalty=penalty, solver=solver,
+                              class_weight=class_weight, max_iter=max_iter, warm_start=True)
+
+
+def _stratified_order(y, rng):
+    """
+    Shuffle row positions so that every prefix keeps the class proportions of y.
+    Successive halving rounds train on prefixes of this order.
+    """
+    positions = np.empty(len(y))
+    for label in np.unique(y):
+        label_rows = np.flatnonzero(y == label)
+        # Spread each class evenly over [0, 1) in a random order
+        positions[label_rows] = (rng.permutation(len(label_rows)) + rng.random()) / len(label_rows)
+    return np.argsort(positions, kind="stable")
+
+
+def build_fold_cache(X, y, n_splits=5, random_state=42, cache_dir=None):
+    """
+    Split the data into stratified folds and standardize each fold once, using the
+    training-part mean and standard deviation, so search candidates reuse the same arrays.
+    Parameters:
+    X(np.ndarray): feature matrix (e.g. from load_features_memmap)
+    y(np.ndarray): binary churn labels
+    n_splits(int, default 5): Number of cross-validation folds
+    random_state(int, default 42): Seed of the fold split and subsample order
+    cache_dir(str, optional): Directory to persist the folds in. When a cache with the same
+        data, folds and seed exists it is memory-mapped instead of recomputed
+
+    Returns:
+    folds(list): one dict per fold with 'X_train', 'y_train', 'X_val', 'y_val' and 'train_order'
+    """
+    y = np.asarray(y)
+    cache_key = {
+        "n_rows": int(len(y)),
+        "n_features": int(X.shape[1]),
+        "n_splits": n_splits,
+        "random_state": random_state,
+        # Cheap content fingerprint so a new extract of the same shape is not served stale folds
+        "checksum": float(np.sum(X, dtype=np.float64)) + float(np.dot(np.arange(len(y)), y))
+    }
+    fold_names = ["X_train", "y_train", "X_val", "y_val", "train_order"]
+
+    if cache_dir is not None:
+        key_path = os.path.join(cache_dir, "folds.json")
+        if os.path.exists(key_path):
+            with open(key_path) as f:
+                if json.load(f) == cache_key:
+                    print(f"Cross-validation folds loaded from cache: {cache_dir}")
+                    return [
+                        {name: np.load(os.path.join(cache_dir, f"fold{i}_{name}.npy"), mmap_mode="r") for name in fold_names}
+                        for i in range(n_splits)
+                    ]
+
+    rng = np.random.default_rng(random_state)
+    splitter = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    folds = []
+    for train_idx, val_idx in splitter.split(np.zeros(len(y)), y):
+        X_train = np.asarray(X[train_idx], dtype=np.float64)
+        mean = X_train.mean(axis=0)
+        scale = X_train.std(axis=0)
+        scale[scale == 0] = 1.0
+        X_train -= mean
+        X_train /= scale
+        folds.append({
+            "X_train": X_train,
+            "y_train": y[train_idx],
+            "X_val": (np.asarray(X[val_idx], dtype=np.float64) - mean) / scale,
+            "y_val": y[val_idx],
+            "train_order": _stratified_order(y[train_idx], rng)
+        })
+
+    if cache_dir is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        for i, fold in enumerate(folds):
+            for name in fold_names:
+                np.save(os.path.join(cache_dir, f"fold{i}_{name}.npy"), fold[name])
+        with open(os.path.join(cache_dir, "folds.json"), "w") as f:
+            json.dump(cache_key, f)
+        print(f"Cross-validation folds cached to: {cache_dir}")
+
+    return folds
+
+""" # EXAMPLE USAGE
+folds = build_fold_cache(features, labels, n_splits=5, cache_dir="./data/processed/cv_cache") """
+
+
+def _fit_regularization_path(fold, n_samples, penalty, class_weight, C_values):
+    """
+    Fit one (penalty, class_weight) path on one fold, warm-starting each C from the
+    previous solution (C ascending, strongest regularization first).
+    Returns the validation ROC AUC for every C.
+    """
+    rows = fold["train_order"][:n_samples]
+    X_train, y_train = fold["X_train"][rows], fold["y_train"][rows]
+
+    model = _make_logistic_regression(C_values[0], penalty, class_weight)
+    scores = []
+    for C in C_values:
+        model.set_params(C=C)
+        model.fit(X_train, y_train)
+        scores.append(roc_auc_score(fold["y_val"], model.predict_proba(fold["X_val"])[:, 1]))
+    return scores
+
+
+def search_logistic_regression(X, y, param_grid=None, n_splits=5, factor=3, min_samples=1000,
+                               n_jobs=-1, random_state=42, cache_dir=None):
+    """
+    Stratified K-fold regularization search for Logistic Regression using successive halving.
+    Every round evaluates the surviving candidates on a larger stratified share of each
+    training fold and keeps the best 1/factor, the last round uses the full training folds.
+    Folds are standardized once (see build_fold_cache), (fold, penalty, class_weight) paths
+    run in parallel and each path warm-starts along its C values.
+    Parameters:
+    X(np.ndarray): feature matrix
+    y(np.ndarray): binary churn labels
+    param_grid(dict, optional): lists of 'C', 'penalty' ('l1'/'l2') and 'class_weight' values,
+        defaults to DEFAULT_PARAM_GRID
+    n_splits(int, default 5): Number of cross-validation folds
+    factor(int, default 3): Share of candidates dropped per round and growth of the training share
+    min_samples(int, default 1000): Smallest number of training rows a first-round fit may use
+    n_jobs(int, default -1): Number of parallel workers, -1 uses all cores
+    random_state(int, default 42): Seed of the fold split
+    cache_dir(str, optional): Directory to cache the standardized folds in
+
+    Returns:
+    best_params(dict): 'C', 'penalty' and 'class_weight' with the best mean validation AUC
+    results_df(pd.DataFrame): mean and std validation AUC of every candidate in every round
+    """
+    if factor < 2:
+        raise ValueError("factor must be at least 2.")
+    param_grid = DEFAULT_PARAM_GRID if param_grid is None else param_grid
+    candidates = [
+        {"C": C, "penalty": penalty, "class_weight": class_weight}
+        for C, penalty, class_weight in itertools.product(param_grid["C"], param_grid["penalty"], param_grid["class_weight"])
+    ]
+
+    folds = build_fold_cache(X, y, n_splits=n_splits, random_state=random_state, cache_dir=cache_dir)
+    n_train = min(len(fold["y_train"]) for fold in folds)
+
+    # Training share grows by `factor` every round and reaches the full folds in the last round
+    n_rounds = max(1, math.ceil(math.log(len(candidates), factor)))
+    first_fraction = max(factor ** -(n_rounds - 1), min(1.0, min_samples / n_train))
+    # min_samples can raise the first share, drop the rounds that would refit on the full folds again
+    n_rounds = min(n_rounds, 1 + math.floor(math.log(1 / first_fraction, factor) + 1e-9))
+
+    results = []
+    for round_idx in range(n_rounds):
+        last_round = round_idx == n_rounds - 1
+        n_samples = n_train if last_round else round(min(1.0, first_fraction * factor ** round_idx) * n_train)
+
+        # Group surviving candidates into regularization paths sorted by C
+        paths = {}
+        for candidate in candidates:
+            paths.setdefault((candidate["penalty"], candidate["class_weight"]), []).append(candidate["C"])
+        paths = {key: sorted(C_values) for key, C_values in paths.items()}
+
+        tasks = [(fold_idx, key) for fold_idx in range(len(folds)) for key in paths]
+        fold_scores = Parallel(n_jobs=n_jobs)(
+            delayed(_fit_regularization_path)(folds[fold_idx], n_samples, key[0], key[1], paths[key])
+            for fold_idx, key in tasks
+        )
+
+        scores = {}
+        for (fold_idx, key), path_scores in zip(tasks, fold_scores):
+            for C, score in zip(paths[key], path_scores):
+                scores.setdefault((key[0], key[1], C), []).append(score)
+
+        round_results = pd.DataFrame([
+            {
+                "round": round_idx,
+                "n_samples": n_samples,
+                "penalty": penalty,
+                "class_weight": str(class_weight),
+                "C": C,
+                "mean_auc": np.mean(fold_values),
+                "std_auc": np.std(fold_values)
+            }
+            for (penalty, class_weight, C), fold_values in scores.items()
+        ])
+        results.append(round_results)
+
+        ranked = sorted(candidates, key=lambda c: -np.mean(scores[(c["penalty"], c["class_weight"], c["C"])]))
+        print(f"Round {round_idx + 1}/{n_rounds}: {len(candidates)} candidates on {n_samples} rows, "
+              f"best AUC {np.mean(scores[(ranked[0]['penalty'], ranked[0]['class_weight'], ranked[0]['C'])]):.4f}")
+        candidates = ranked if last_round else ranked[:max(1, math.ceil(len(ranked) / factor))]
+
+    best_params = candidates[0]
+    results_df = pd.concat(results, ignore_index=True).sort_values(
+        by=["round", "mean_auc"], ascending=[True, False]
+    ).reset_index(drop=True)
+    print(f"Best parameters: {best_params}")
+    return best_params, results_df
+
+""" # EXAMPLE USAGE
+best_params, search_results_df = search_logistic_regression(features, labels, n_splits=5, n_jobs=-1) """
+
+
+def out_of_fold_predictions(X, y, best_params, n_splits=5, random_state=42, cache_dir=None):
+    """
+    Validation-fold churn probabilities of the selected parameters, for unbiased model metrics.
+    Reuses the standardized folds of build_fold_cache.
+    Parameters:
+    X(np.ndarray): feature matrix
+    y(np.ndarray): binary churn labels
+    best_params(dict): 'C', 'penalty' and 'class_weight' (from search_logistic_regression)
+    n_splits(int, default 5): Number of cross-validation folds
+    random_state(int, default 42): Seed of the fold split
+    cache_dir(str, optional): Directory the standardized folds are cached in
+
+    Returns:
+    y_true(np.ndarray): labels of the validation folds, concatenated
+    y_score(np.ndarray): out-of-fold churn probabilities, aligned with y_true
+    """
+    folds = build_fold_cache(X, y, n_splits=n_splits, random_state=random_state, cache_dir=cache_dir)
+    y_true, y_score = [], []
+    for fold in folds:
+        model = _make_logistic_regression(best_params["C"], best_params["penalty"], best_params["class_weight"])
+        model.fit(fold["X_train"], fold["y_train"])
+        y_true.append(np.asarray(fold["y_val"]))
+        y_score.append(model.predict_proba(fold["X_val"])[:, 1])
+    return np.concatenate(y_true), np.concatenate(y_score)
+
+""" # EXAMPLE USAGE
+y_true, y_score = out_of_fold_predictions(features, labels, best_params, cache_dir="./data/processed/cv_cache") """
+
+
+def fit_final_model(X, y, feature_cols, best_params, preprocessing=None):
+    """
+    Standardize the full data and fit the selected Logistic Regression.
+    Parameters:
+    X(np.ndarray): feature matrix
+    y(np.ndarray): binary churn labels
+    feature_cols(list): column names of X, in order
+    best_params(dict): 'C', 'penalty' and 'class_weight' (from search_logistic_regression)
+    preprocessing(dict, optional): training-time cleaning and feature statistics needed to
+    transform raw scoring data ('yes_no_cols', 'vocabulary', 'feature_stats')
+
+    Returns:
+    model_bundle(dict): 'model', 'feature_cols', 'mean', 'scale', 'params' and 'preprocessing'
+    """
+    X = np.asarray(X, dtype=np.float64)
+    mean = X.mean(axis=0)
+    scale = X.std(axis=0)
+    scale[scale == 0] = 1.0
+
+    model = _make_logistic_regression(best_params["C"], best_params["penalty"], best_params["class_weight"])
+    model.set_params(warm_start=False)
+    model.fit((X - mean) / scale, y)
+
+    return {
+        "model": model,
+        "feature_cols": list(feature_cols),
+        "mean": mean,
+        "scale": scale,
+        "params": dict(best_params),
+        "preprocessing": dict(preprocessing or {})
+    }
+
+
+def predict_churn_proba(model_bundle, X):
+    """
+    Churn probabilities for a feature matrix, standardized with the training statistics.
+    Parameters:
+    model_bundle(dict): Output of fit_final_model
+    X(np.ndarray): feature matrix with the columns of model_bundle['feature_cols']
+
+    Returns:
+    proba(np.ndarray): probability of churn for every row
+    """
+    X = (np.asarray(X, dtype=np.float64) - model_bundle["mean"]) / model_bundle["scale"]
+    return model_bundle["model"].predict_proba(X)[:, 1]
+
+
+def save_model(model_bundle, path):
+    """Save a model bundle with joblib"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    joblib.dump(model_bundle, path)
+    print(f"Model saved to: {path}")
+
+
+def load_model(path):
+    """Load a model bundle saved with save_model"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Model file not found at: {path}")
+    return joblib.load(path)
+
+""" # EXAMPLE USAGE
+model_bundle = fit_final_model(features, labels, metadata["columns"], best_params)
+save_model(model_bundle, "./models/churn_logistic_regression.joblib") """
@@ -0,0 +1,233 @@
+import pandas as pd
+import numpy as np
+from joblib import Parallel, delayed
+
+# Replicates are drawn and evaluated in blocks, one block per parallel task
+BLOCK_SIZE = 1000
+
+
+def _draw_cell_weights(cell_counts, n_replicates, method, seed):
+    """
+    Resample aggregated cells instead of rows: resampling n rows with replacement
+    gives multinomial cell counts, Poisson(1) row weights give Poisson cell counts.
+    Returns an array of shape (n_replicates, cells).
+    """
+    rng = np.random.default_rng(seed)
+    if method == "poisson":
+        return rng.poisson(cell_counts, size=(n_replicates, len(cell_counts)))
+    if method == "multinomial":
+        total = cell_counts.sum()
+        return rng.multinomial(total, cell_counts / total, size=n_replicates)
+    raise ValueError(f"Unsupported resampling method '{method}'. Use 'poisson' or 'multinomial'.")
+
+
+def _bootstrap_block(statistic, cell_counts, n_replicates, method, seed, statistic_args):
+    """Draw one block of replicate weights and evaluate the statistic on them."""
+    weights = _draw_cell_weights(cell_counts, n_replicates, method, seed)
+    return statistic(weights, *statistic_args)
+
+
+def bootstrap_cells(statistic, cell_counts, statistic_args=(), n_replicates=10000, method="poisson",
+                    n_jobs=-1, random_state=42):
+    """
+    Bootstrap a statistic of aggregated cell counts, blocks of replicates run in parallel processes.
+    Parameters:
+    statistic(callable): maps weights of shape (replicates, cells) and statistic_args to
+        an array of shape (replicates, ...)
+    cell_counts(np.ndarray): observed number of rows in every cell
+    statistic_args(tuple): extra arguments passed to the statistic
+    n_replicates(int, default 10000): Number of bootstrap replicates
+    method(str, default 'poisson'): 'poisson' or 'multinomial' resampling weights
+    n_jobs(int, default -1): Number of parallel workers, -1 uses all cores
+    random_state(int, default 42): Seed of the resampling
+
+    Returns:
+    replicates(np.ndarray): statistic of every replicate, stacked on the first axis
+    """
+    cell_counts = np.asarray(cell_counts)
+    block_sizes = [min(BLOCK_SIZE, n_replicates - start) for start in range(0, n_replicates, BLOCK_SIZE)]
+    # Independent streams per block so results don't depend on the number of workers
+    seeds = np.random.SeedSequence(random_state).spawn(len(block_sizes))
+
+    if len(block_sizes) == 1 or n_jobs == 1:
+        blocks = [
+            _bootstrap_block(statistic, cell_counts, size, method, seed, statistic_args)
+            for size, seed in zip(block_sizes, seeds)
+        ]
+    else:
+        blocks = Parallel(n_jobs=n_jobs)(
+            delayed(_bootstrap_block)(statistic, cell_counts, size, method, seed, statistic_args)
+            for size, seed in zip(block_sizes, seeds)
+        )
+    return np.concatenate(blocks, axis=0)
+
+
+def _percentile_interval(replicates, confidence):
+    """Percentile bootstrap interval along the replicate axis, ignoring undefined replicates."""
+    alpha = (1 - confidence) / 2
+    return np.nanquantile(replicates, alpha, axis=0), np.nanquantile(replicates, 1 - alpha, axis=0)
+
+
+def _segment_churn_rates(weights):
+    """Churn rate per segment from (replicates, segments * 2) weights, cells ordered (segment, churned)."""
+    weights = weights.reshape(len(weights), -1, 2)
+    totals = weights.sum(axis=2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(totals > 0, weights[:, :, 1] / totals, np.nan)
+
+
+def segment_churn_rate_ci(df, segment_col, churn_col="Churn", n_replicates=10000, confidence=0.95,
+                          method="poisson", n_jobs=-1, random_state=42):
+    """
+    Bootstrap confidence intervals for the churn rate of every segment.
+    Rows are reduced to (segment, churned) cell counts in one pass, so each replicate
+    costs O(segments) whatever the number of customers.
+    Parameters:
+    df(pd.DataFrame): customer dataset with binary churn column (1 = churned)
+    segment_col(str): Column to compute churn rates for (e.g. 'Contract')
+    churn_col(str, default 'Churn'): Column name for churn labels
+    n_replicates(int, default 10000): Number of bootstrap replicates
+    confidence(float, default 0.95): Confidence level of the intervals
+    method(str, default 'poisson'): 'poisson' or 'multinomial' resampling weights
+    n_jobs(int, default -1): Number of parallel workers, -1 uses all cores
+    random_state(int, default 42): Seed of the resampling
+
+    Returns:
+    churn_rate_ci_df(pd.DataFrame): TotalCustomers, ChurnedCustomers, ChurnRate, ChurnRateLower
+    and ChurnRateUpper indexed by segment
+    """
+    codes, segments = pd.factorize(df[segment_col], sort=True)
+    if np.any(codes < 0):
+        raise ValueError(f"Column '{segment_col}' contains missing values.")
+    churned = (df[churn_col] == 1).to_numpy().astype(np.int64)
+
+    cell_counts = np.bincount(codes * 2 + churned, minlength=len(segments) * 2)
+    replicates = bootstrap_cells(_segment_churn_rates, cell_counts, n_replicates=n_replicates,
+                                 method=method, n_jobs=n_jobs, random_state=random_state)
+    lower, upper = _percentile_interval(replicates, confidence)
+
+    counts = cell_counts.reshape(-1, 2)
+    churn_rate_ci_df = pd.DataFrame({
+        "TotalCustomers": counts.sum(axis=1),
+        "ChurnedCustomers": counts[:, 1],
+        "ChurnRate": counts[:, 1] / counts.sum(axis=1),
+        "ChurnRateLower": lower,
+        "ChurnRateUpper": upper
+    }, index=pd.Index(segments, name=segment_col))
+    return churn_rate_ci_df
+
+""" # EXAMPLE USAGE
+contract_churn_ci_df = segment_churn_rate_ci(df, "Contract", n_replicates=10000) """
+
+
+def _model_metrics(weights, k_values, score_means, calibration_bins):
+    """
+    AUC, precision@K, expected calibration error and per-bin observed churn rate from
+    (replicates, score bins * 2) weights, cells ordered (score bin ascending, label).
+    """
+    weights = weights.reshape(len(weights), -1, 2).astype(np.float64)
+    negatives, positives = weights[:, :, 0], weights[:, :, 1]
+    totals = negatives + positives
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # AUC: positives in a bin beat all negatives in lower bins and tie with their own bin
+        negatives_below = np.cumsum(negatives, axis=1) - negatives
+        auc = (positives * (negatives_below + 0.5 * negatives)).sum(axis=1) / (
+            positives.sum(axis=1) * negatives.sum(axis=1)
+        )
+
+        # precision@K: walk the bins from the highest score down, splitting the bin that crosses K
+        totals_desc = totals[:, ::-1]
+        cum_totals = np.cumsum(totals_desc, axis=1)
+        cum_positives = np.cumsum(positives[:, ::-1], axis=1)
+        precision_at_k = []
+        for k in k_values:
+            crossing = np.minimum((cum_totals < k).sum(axis=1), totals.shape[1] - 1)
+            rows = np.arange(len(weights))
+            totals_before = cum_totals[rows, crossing] - totals_desc[rows, crossing]
+            positives_before = cum_positives[rows, crossing] - positives[:, ::-1][rows, crossing]
+            share = np.clip((k - totals_before) / totals_desc[rows, crossing], 0, 1)
+            taken = np.minimum(cum_totals[:, -1], k)
+            precision_at_k.append((positives_before + share * positives[:, ::-1][rows, crossing]) / taken)
+
+        # Calibration: group fine score bins into calibration bins
+        predicted = np.add.reduceat(totals * score_means, calibration_bins, axis=1)
+        observed = np.add.reduceat(positives, calibration_bins, axis=1)
+        counts = np.add.reduceat(totals, calibration_bins, axis=1)
+        observed_rate = observed / counts
+        ece = np.nansum(np.abs(observed_rate - predicted / counts) * counts, axis=1) / counts.sum(axis=1)
+
+    return np.column_stack([auc] + precision_at_k + [ece, observed_rate])
+
+
+def model_metric_ci(y_true, y_score, k=(100,), n_bins=1000, n_calibration_bins=10, n_replicates=10000,
+                    confidence=0.95, method="poisson", n_jobs=-1, random_state=42):
+    """
+    Bootstrap confidence intervals for AUC, precision@K and calibration of churn scores.
+    Scores are reduced to (score bin, label) cell counts over n_bins equal-width bins of
+    [0, 1], so each replicate costs O(n_bins) whatever the number of customers. Metrics are
+    computed on the binned scores (ties within a bin count as half for AUC).
+    Parameters:
+    y_true(np.ndarray): binary churn labels
+    y_score(np.ndarray): predicted churn probabilities
+    k(int/tuple, default (100,)): Number(s) of top-ranked customers for precision@K
+    n_bins(int, default 1000): Number of score bins
+    n_calibration_bins(int, default 10): Number of calibration bins (must divide n_bins)
+    n_replicates(int, default 10000): Number of bootstrap replicates
+    confidence(float, default 0.95): Confidence level of the intervals
+    method(str, default 'poisson'): 'poisson' or 'multinomial' resampling weights
+    n_jobs(int, default -1): Number of parallel workers, -1 uses all cores
+    random_state(int, default 42): Seed of the resampling
+
+    Returns:
+    metrics_df(pd.DataFrame): Estimate, Lower and Upper of 'auc', 'precision@K' and 'ece'
+    calibration_df(pd.DataFrame): mean predicted and observed churn rate (with interval) per calibration bin
+    """
+    y_true = (np.asarray(y_true) == 1).astype(np.int64)
+    y_score = np.asarray(y_score, dtype=np.float64)
+    if len(y_true) != len(y_score):
+        raise ValueError("y_true and y_score must have the same length.")
+    if n_bins % n_calibration_bins != 0:
+        raise ValueError("n_calibration_bins must divide n_bins.")
+    k_values = [k] if np.isscalar(k) else list(k)
+
+    score_bins = np.minimum((np.clip(y_score, 0, 1) * n_bins).astype(np.int64), n_bins - 1)
+    cells = score_bins * 2 + y_true
+    cell_counts = np.bincount(cells, minlength=n_bins * 2)
+    # Mean score of each fine bin, weighted by resampled counts for the calibration curve
+    bin_counts = cell_counts.reshape(-1, 2).sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        score_means = np.where(bin_counts > 0, np.bincount(score_bins, weights=y_score, minlength=n_bins) / bin_counts,
+                               (np.arange(n_bins) + 0.5) / n_bins)
+    calibration_bins = np.arange(0, n_bins, n_bins // n_calibration_bins)
+
+    statistic_args = (k_values, score_means, calibration_bins)
+    estimate = _model_metrics(cell_counts[np.newaxis, :], *statistic_args)[0]
+    replicates = bootstrap_cells(_model_metrics, cell_counts, statistic_args, n_replicates=n_replicates,
+                                 method=method, n_jobs=n_jobs, random_state=random_state)
+    lower, upper = _percentile_interval(replicates, confidence)
+
+    n_metrics = 2 + len(k_values)
+    metrics_df = pd.DataFrame({
+        "Estimate": estimate[:n_metrics],
+        "Lower": lower[:n_metrics],
+        "Upper": upper[:n_metrics]
+    }, index=pd.Index(["auc"] + [f"precision@{value}" for value in k_values] + ["ece"], name="Metric"))
+
+    calibration_counts = np.add.reduceat(bin_counts, calibration_bins)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_predicted = np.add.reduceat(bin_counts * score_means, calibration_bins) / calibration_counts
+    calibration_df = pd.DataFrame({
+        "Customers": calibration_counts,
+        "MeanPredicted": mean_predicted,
+        "ObservedChurnRate": estimate[n_metrics:],
+        "ObservedLower": lower[n_metrics:],
+        "ObservedUpper": upper[n_metrics:]
+    }, index=pd.Index(
+        [f"{start / n_bins:.2f}-{(start + n_bins // n_calibration_bins) / n_bins:.2f}" for start in calibration_bins],
+        name="ScoreBin"
+    ))
+    return metrics_df, calibration_df
+
+""" # EXAMPLE USAGE
+metrics_df, calibration_df = model_metric_ci(y_true, y_score, k=(500, 1000), n_replicates=10000) """
@@ -0,0 +1,183 @@
+import pandas as pd
+import numpy as np
+from statistics import NormalDist
+
+# Columns added to every stratified sample
+WEIGHT_COL = "sample_weight"
+STRATUM_COL = "sample_stratum"
+_KEY_COL = "_sample_key"
+
+
+def stratified_reservoir_sample(chunks, strata_cols, per_stratum=2000, random_state=42):
+    """
+    Draw a stratified sample in one streaming pass, keeping at most per_stratum rows per stratum.
+    Every row gets a random priority and each stratum keeps its per_stratum smallest priorities,
+    which is a uniform sample without replacement of that stratum (bottom-k reservoir).
+    Memory is bounded by the number of strata x per_stratum plus one chunk.
+    Parameters:
+    chunks(pd.DataFrame/iterable): the data, or an iterator of chunks
+    strata_cols(list): Columns defining the strata, e.g. ['Churn', 'Contract', 'InternetService', 'tenure_group_6m']
+    per_stratum(int, default 2000): Largest number of rows kept per stratum
+    random_state(int, default 42): Seed of the row priorities
+
+    Returns:
+    sample_df(pd.DataFrame): the sampled rows with 'sample_weight' (population rows represented by each
+    sampled row, N_h / n_h) and 'sample_stratum' columns
+    """
+    if isinstance(chunks, pd.DataFrame):
+        chunks = [chunks]
+    strata_cols = list(strata_cols)
+    rng = np.random.default_rng(random_state)
+
+    reservoir = None
+    population_counts = None
+    for chunk in chunks:
+        missing_cols = [col for col in strata_cols if col not in chunk.columns]
+        if missing_cols:
+            raise KeyError(f"Strata columns not found in data: {missing_cols}")
+
+        chunk = chunk.assign(**{_KEY_COL: rng.random(len(chunk))})
+        chunk_counts = chunk.groupby(strata_cols, dropna=False, observed=True).size()
+        population_counts = chunk_counts if population_counts is None else population_counts.add(chunk_counts, fill_value=0)
+
+        # Keep the per_stratum smallest priorities among the reservoir and the new chunk
+        combined = chunk if reservoir is None else pd.concat([reservoir, chunk], ignore_index=True)
+        reservoir = (
+            combined.sort_values(_KEY_COL)
+            .groupby(strata_cols, dropna=False, observed=True, sort=False)
+            .head(per_stratum)
+        )
+
+    if reservoir is None:
+        raise ValueError("No data to sample from.")
+
+    sample_counts = reservoir.groupby(strata_cols, dropna=False, observed=True).size()
+    strata = pd.DataFrame({
+        WEIGHT_COL: population_counts.reindex(sample_counts.index) / sample_counts,
+        STRATUM_COL: np.arange(len(sample_counts))
+    }).reset_index()
+
+    sample_df = reservoir.drop(columns=_KEY_COL).merge(strata, on=strata_cols, how="left").reset_index(drop=True)
+    print(f"Stratified sample drawn: {len(sample_df)} of {int(population_counts.sum())} rows over {len(strata)} strata.")
+    return sample_df
+
+""" # EXAMPLE USAGE
+chunks = (df.iloc[start:start + 500_000] for start in range(0, len(df), 500_000))
+sample_df = stratified_reservoir_sample(chunks, ["Churn", "Contract", "InternetService", "tenure_group_6m"], per_stratum=500) """
+
+
+def weighted_churn_rates(sample_df, group_col, churn_col="Churn", weight_col=WEIGHT_COL, confidence=0.95):
+    """
+    Population churn rate per group estimated from a stratified sample, with its sampling error.
+    The standard error is the stratified-sampling (linearized ratio) estimate, including the
+    finite population correction, so groups that are unions of strata get an exact rate (error 0).
+    Parameters:
+    sample_df(pd.DataFrame): Output of stratified_reservoir_sample
+    group_col(str): Column to compute churn rates for (e.g. 'Contract')
+    churn_col(str, default 'Churn'): Column name for churn labels (1 = churned)
+    weight_col(str, default 'sample_weight'): Column with the sampling weights
+    confidence(float, default 0.95): Confidence level of the intervals
+
+    Returns:
+    churn_rate_df(pd.DataFrame): estimated TotalCustomers and ChurnedCustomers, ChurnRate,
+    ChurnRateStdError, ChurnRateLower and ChurnRateUpper indexed by group
+    """
+    weights = sample_df[weight_col].to_numpy(dtype=np.float64)
+    churned = (sample_df[churn_col] == 1).to_numpy(dtype=np.float64)
+    strata = sample_df[STRATUM_COL].to_numpy()
+
+    # Per stratum: sample size n_h and population size N_h = weight x n_h
+    stratum_sizes = np.bincount(strata)
+    population_sizes = np.bincount(strata, weights=weights)
+    # Strata emptied by a filter on the sample (e.g. eligible customers only) contribute nothing
+    with np.errstate(divide="ignore", invalid="ignore"):
+        stratum_factor = np.where(
+            stratum_sizes > 1,
+            population_sizes ** 2 * (1 - stratum_sizes / population_sizes) / np.maximum(stratum_sizes, 1),
+            0.0
+        )
+
+    z_score = NormalDist().inv_cdf(0.5 + confidence / 2)
+    rows = {}
+    for group, in_group in sample_df.groupby(group_col, observed=True).indices.items():
+        domain = np.zeros(len(sample_df))
+        domain[in_group] = 1.0
+        total = np.sum(weights * domain)
+        churned_total = np.sum(weights * domain * churned)
+        rate = churned_total / total
+
+        # Linearized ratio residuals, variance taken within each stratum
+        residual = domain * (churned - rate) / total
+        residual_sum = np.bincount(strata, weights=residual)
+        residual_sq_sum = np.bincount(strata, weights=residual ** 2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            stratum_variance = np.where(
+                stratum_sizes > 1,
+                (residual_sq_sum - residual_sum ** 2 / stratum_sizes) / (stratum_sizes - 1),
+                0.0
+            )
+        std_error = float(np.sqrt(max(np.sum(stratum_factor * stratum_variance), 0.0)))
+
+        rows[group] = {
+            "TotalCustomers": total,
+            "ChurnedCustomers": churned_total,
+            "ChurnRate": rate,
+            "ChurnRateStdError": std_error,
+            "ChurnRateLower": max(rate - z_score * std_error, 0.0),
+            "ChurnRateUpper": min(rate + z_score * std_error, 1.0)
+        }
+
+    churn_rate_df = pd.DataFrame.from_dict(rows, orient="index")
+    churn_rate_df.index.name = group_col
+    return churn_rate_df
+
+""" # EXAMPLE USAGE
+contract_churn_df = weighted_churn_rates(sample_df, "Contract") """
+
+
+def weighted_counts(sample_df, group_col, weight_col=WEIGHT_COL, confidence=0.95):
+    """
+    Population count per group estimated from a stratified sample, with its sampling error.
+    Parameters:
+    sample_df(pd.DataFrame): Output of stratified_reservoir_sample
+    group_col(str): Column to count customers for (e.g. 'Churn')
+    weight_col(str, default 'sample_weight'): Column with the sampling weights
+    confidence(float, default 0.95): Confidence level of the intervals
+
+    Returns:
+    counts_df(pd.DataFrame): Customers, CustomersStdError, CustomersLower and CustomersUpper indexed by group
+    """
+    weights = sample_df[weight_col].to_numpy(dtype=np.float64)
+    strata = sample_df[STRATUM_COL].to_numpy()
+    stratum_sizes = np.bincount(strata)
+    population_sizes = np.bincount(strata, weights=weights)
+    z_score = NormalDist().inv_cdf(0.5 + confidence / 2)
+
+    rows = {}
+    for group, in_group in sample_df.groupby(group_col, observed=True).indices.items():
+        domain = np.zeros(len(sample_df))
+        domain[in_group] = 1.0
+        # Estimated count N_h x (share of stratum h in the group), variance of a stratified total
+        with np.errstate(divide="ignore", invalid="ignore"):
+            share = np.where(stratum_sizes > 0, np.bincount(strata, weights=domain) / stratum_sizes, 0.0)
+            variance = np.where(
+                stratum_sizes > 1,
+                population_sizes ** 2 * (1 - stratum_sizes / population_sizes)
+                * share * (1 - share) / (stratum_sizes - 1),
+                0.0
+            )
+        count = float(np.sum(population_sizes * share))
+        std_error = float(np.sqrt(max(np.sum(variance), 0.0)))
+        rows[group] = {
+            "Customers": count,
+            "CustomersStdError": std_error,
+            "CustomersLower": max(count - z_score * std_error, 0.0),
+            "CustomersUpper": count + z_score * std_error
+        }
+
+    counts_df = pd.DataFrame.from_dict(rows, orient="index")
+    counts_df.index.name = group_col
+    return counts_df
+
+""" # EXAMPLE USAGE
+churn_counts_df = weighted_counts(sample_df, "Churn") """
@@ -0,0 +1,206 @@
+import pandas as pd
+import numpy as np
+
+# Number of set bits for every possible byte, used to popcount packed bitmaps
+_POPCOUNT_TABLE = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount(bitmap):
+    """Count the set bits of a packed bitmap."""
+    return int(_POPCOUNT_TABLE[bitmap].sum(dtype=np.int64))
+
+
+def build_segment_index(df, columns=None, churn_col="Churn", tenure_col="tenure", max_categories=20):
+    """
+    Build packed bitmap indexes (one bit per customer) for every value of the segment columns.
+    Bitmaps are stored with np.packbits, 8 customers per byte.
+    Parameters:
+    df(pd.DataFrame): customer dataset with binary churn column (1 = churned)
+    columns(list, optional): Columns to index. Defaults to every column with at most
+        `max_categories` distinct values (services, add-ons, contract, payment, demographics)
+    churn_col(str, default 'Churn'): Column name for churn labels
+    tenure_col(str, default 'tenure'): Tenure column, indexed as 6-month bins ('tenure_group_6m_label')
+    max_categories(int, default 20): Highest number of distinct values for a column to be indexed
+
+    Returns:
+    index(dict): 'n_rows', 'churned' bitmap and 'bitmaps' as {column: {value: bitmap}}
+    """
+    if churn_col not in df.columns:
+        raise KeyError(f"Churn column '{churn_col}' not found in DataFrame.")
+
+    data = {}
+    if columns is None:
+        columns = [
+            col for col in df.columns
+            if col not in (churn_col, tenure_col) and df[col].nunique(dropna=True) <= max_categories
+        ]
+    for col in columns:
+        if col not in df.columns:
+            raise KeyError(f"Column '{col}' not found in DataFrame.")
+        data[col] = df[col]
+
+    # Tenure grouped in 6-month bins, same labels as create_tenure_lifecycle_features
+    if tenure_col in df.columns:
+        tenure_group = (df[tenure_col] // 6) * 6
+        data["tenure_group_6m_label"] = tenure_group.astype(int).astype(str) + "-" + (tenure_group + 6).astype(int).astype(str)
+
+    bitmaps = {}
+    for col, series in data.items():
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Encoded columns already hold integer codes, only categories present get a bitmap
+            codes = series.cat.codes.to_numpy()
+            present = np.flatnonzero(np.bincount(codes[codes >= 0], minlength=len(series.cat.categories)))
+            values = [(series.cat.categories[code], code) for code in present]
+        else:
+            codes, uniques = pd.factorize(series, sort=True)
+            values = [(value, code) for code, value in enumerate(uniques)]
+        bitmaps[col] = {
+            (value.item() if hasattr(value, "item") else value): np.packbits(codes == code)
+            for value, code in values
+        }
+
+    index = {
+        "n_rows": len(df),
+        "churned": np.packbits((df[churn_col] == 1).to_numpy()),
+        "bitmaps": bitmaps
+    }
+    n_bitmaps = sum(len(values) for values in bitmaps.values())
+    print(f"Segment index built: {n_bitmaps} bitmaps over {len(bitmaps)} columns and {len(df)} customers.")
+    return index
+
+""" # EXAMPLE USAGE
+segment_index = build_segment_index(df) """
+
+
+def segment_bitmap(index, filters):
+    """
+    Evaluate a segment filter against the bitmap index.
+    A dict is an AND across columns, a list of values for one column is an OR within
+    that column, and a list of dicts is an OR across the dicts.
+    Parameters:
+    index(dict): Output of build_segment_index
+    filters(dict/list): e.g. {"InternetService": "Fiber optic", "TechSupport": "No",
+        "Contract": "Month-to-month", "PaymentMethod": ["Electronic check", "Mailed check"]}
+
+    Returns:
+    bitmap(np.ndarray): packed bitmap of the matching customers
+    """
+    if isinstance(filters, list):
+        bitmap = np.zeros_like(index["churned"])
+        for condition in filters:
+            bitmap |= segment_bitmap(index, condition)
+        return bitmap
+
+    bitmap = np.packbits(np.ones(index["n_rows"], dtype=bool))
+    for col, values in filters.items():
+        if col not in index["bitmaps"]:
+            raise KeyError(f"Column '{col}' is not in the segment index.")
+        if not isinstance(values, (list, tuple, set)):
+            values = [values]
+
+        # OR the bitmaps of the accepted values, unknown values match nobody
+        column_bitmap = np.zeros_like(bitmap)
+        for value in values:
+            if value in index["bitmaps"][col]:
+                column_bitmap |= index["bitmaps"][col][value]
+        bitmap &= column_bitmap
+    return bitmap
+
+
+def segment_churn_counts(index, filters):
+    """
+    Count total and churned customers of a segment by bitmap intersection and popcount.
+    Parameters:
+    index(dict): Output of build_segment_index
+    filters(dict/list): Segment filter, see segment_bitmap
+
+    Returns:
+    summary(dict): 'TotalCustomers', 'ChurnedCustomers' and 'ChurnRate' of the segment
+    """
+    bitmap = segment_bitmap(index, filters)
+    total = _popcount(bitmap)
+    churned = _popcount(bitmap & index["churned"])
+    return {
+        "TotalCustomers": total,
+        "ChurnedCustomers": churned,
+        "ChurnRate": churned / total if total > 0 else float("nan")
+    }
+
+""" # EXAMPLE USAGE
+segment_churn_counts(segment_index, {"InternetService": "Fiber optic", "TechSupport": "No",
+                                     "Contract": "Month-to-month", "PaymentMethod": "Electronic check"}) """
+
+
+def segment_mask(index, filters):
+    """
+    Boolean row mask of a segment, to select its customers from the indexed DataFrame.
+    Parameters:
+    index(dict): Output of build_segment_index
+    filters(dict/list): Segment filter, see segment_bitmap
+
+    Returns:
+    mask(np.ndarray): boolean array with one entry per customer
+    """
+    return np.unpackbits(segment_bitmap(index, filters), count=index["n_rows"]).astype(bool)
+
+
+def top_churn_segments(index, depth=2, top_n=10, min_customers=100, columns=None):
+    """
+    Enumerate segment combinations (one value per column) up to `depth` columns and
+    return the highest churn rates. Combinations smaller than `min_customers` are pruned
+    before being extended, since adding a condition can only shrink a segment.
+    Parameters:
+    index(dict): Output of build_segment_index
+    depth(int, default 2): Maximum number of columns combined in a segment
+    top_n(int, default 10): Number of segments to return
+    min_customers(int, default 100): Minimum segment size to be reported or extended
+    columns(list, optional): Columns to combine, defaults to all indexed columns
+
+    Returns:
+    top_segments_df(pd.DataFrame): Segment, Depth, TotalCustomers, ChurnedCustomers, ChurnRate
+    """
+    if depth < 1:
+        raise ValueError("depth must be at least 1.")
+    columns = list(index["bitmaps"]) if columns is None else list(columns)
+    items = [
+        (col_pos, col, value, bitmap)
+        for col_pos, col in enumerate(columns)
+        for value, bitmap in index["bitmaps"][col].items()
+    ]
+
+    rows = []
+    # Frontier of surviving combinations: (last column position, conditions, bitmap)
+    frontier = [(-1, (), None)]
+    for level in range(1, depth + 1):
+        next_frontier = []
+        for last_pos, conditions, bitmap in frontier:
+            # Only extend with later columns so each combination is visited once
+            for col_pos, col, value, item_bitmap in items:
+                if col_pos <= last_pos:
+                    continue
+                combined = item_bitmap if bitmap is None else bitmap & item_bitmap
+                total = _popcount(combined)
+                if total < min_customers:
+                    continue
+                churned = _popcount(combined & index["churned"])
+                segment = conditions + ((col, value),)
+                rows.append({
+                    "Segment": " & ".join(f"{c} = {v}" for c, v in segment),
+                    "Depth": level,
+                    "TotalCustomers": total,
+                    "ChurnedCustomers": churned,
+                    "ChurnRate": churned / total
+                })
+                # The deepest level is only counted, never kept, to bound memory
+                if level < depth:
+                    next_frontier.append((col_pos, segment, combined))
+        frontier = next_frontier
+
+    top_segments_df = pd.DataFrame(rows, columns=["Segment", "Depth", "TotalCustomers", "ChurnedCustomers", "ChurnRate"])
+    top_segments_df = top_segments_df.sort_values(
+        by=["ChurnRate", "TotalCustomers"], ascending=False
+    ).head(top_n).reset_index(drop=True)
+    return top_segments_df
+
+""" # EXAMPLE USAGE
+top_segments_df = top_churn_segments(segment_index, depth=3, top_n=20, min_customers=100) """
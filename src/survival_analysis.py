@@ -0,0 +1,148 @@
+import pandas as pd
+import numpy as np
+from statistics import NormalDist
+
+def count_tenure_events(df, tenure_col="tenure", churn_col="Churn", segment_col=None):
+    """
+    Count churn events and exits per tenure month in a single pass.
+    A churned customer (Churn == 1) is an event at their tenure month,
+    a retained customer is censored (still active) at their tenure month.
+    Parameters:
+    df(pd.DataFrame): customer dataset with binary churn column (1 = churned)
+    tenure_col(str, default 'tenure'): Column name for tenure in months
+    churn_col(str, default 'Churn'): Column name for churn labels
+    segment_col(str, optional): Column to split the counts by (e.g. 'Contract')
+
+    Returns:
+    segments(np.ndarray): segment labels, one per row of the count arrays
+    events(np.ndarray): churn events, shape (segments, max tenure + 1)
+    exits(np.ndarray): customers leaving observation (churned or censored), same shape
+    """
+    tenure = df[tenure_col].to_numpy()
+    if np.any(tenure < 0):
+        raise ValueError(f"Column '{tenure_col}' contains negative tenure values.")
+    tenure = tenure.astype(np.int64)
+    churned = (df[churn_col] == 1).to_numpy()
+
+    if segment_col is None:
+        codes = np.zeros(len(df), dtype=np.int64)
+        segments = np.array(["All"], dtype=object)
+    else:
+        codes, segments = pd.factorize(df[segment_col], sort=True)
+        if np.any(codes < 0):
+            raise ValueError(f"Column '{segment_col}' contains missing values.")
+        segments = np.asarray(segments, dtype=object)
+
+    # --- One bincount over (segment, tenure) cells instead of a groupby per segment
+    n_months = int(tenure.max()) + 1 if len(tenure) else 1
+    cell = codes * n_months + tenure
+    size = len(segments) * n_months
+    exits = np.bincount(cell, minlength=size).reshape(len(segments), n_months)
+    events = np.bincount(cell, weights=churned, minlength=size).reshape(len(segments), n_months)
+
+    return segments, events.astype(np.int64), exits
+
+""" # EXAMPLE USAGE
+segments, events, exits = count_tenure_events(df, segment_col="Contract") """
+
+
+def kaplan_meier_from_counts(events, exits, confidence=0.95):
+    """
+    Compute Kaplan-Meier survival, monthly hazard and confidence bands from count arrays.
+    Works on a 1-D array (one curve) or a 2-D array (one curve per row), cost is
+    O(months x segments) regardless of the number of customers.
+    Parameters:
+    events(np.ndarray): churn events per tenure month
+    exits(np.ndarray): customers leaving observation per tenure month
+    confidence(float, default 0.95): Confidence level of the survival bands
+
+    Returns:
+    curves(dict): arrays 'at_risk', 'hazard', 'survival', 'ci_lower', 'ci_upper'
+    """
+    events = np.atleast_2d(np.asarray(events, dtype=float))
+    exits = np.atleast_2d(np.asarray(exits, dtype=float))
+    if events.shape != exits.shape:
+        raise ValueError("events and exits must have the same shape.")
+    if np.any(events > exits):
+        raise ValueError("events cannot exceed exits in any tenure month.")
+
+    # Customers at risk at month t = everyone whose tenure is >= t (reverse cumulative sum)
+    at_risk = np.cumsum(exits[:, ::-1], axis=1)[:, ::-1]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Monthly hazard: share of at-risk customers who churn in that month
+        hazard = np.where(at_risk > 0, events / at_risk, 0.0)
+        survival = np.cumprod(1.0 - hazard, axis=1)
+
+        # Greenwood variance term, accumulated along tenure
+        greenwood = np.where(
+            at_risk > events,
+            events / (at_risk * (at_risk - events)),
+            0.0
+        )
+        greenwood = np.cumsum(greenwood, axis=1)
+
+        # Log(-log) transformed bands stay inside [0, 1]
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        log_survival = np.log(survival)
+        spread = z * np.sqrt(greenwood) / np.abs(log_survival)
+        ci_lower = survival ** np.exp(spread)
+        ci_upper = survival ** np.exp(-spread)
+
+    # Where the band is undefined (S = 1 or S = 0) collapse it onto the estimate
+    undefined = ~np.isfinite(spread) | (survival <= 0) | (survival >= 1)
+    ci_lower = np.where(undefined, survival, ci_lower)
+    ci_upper = np.where(undefined, survival, ci_upper)
+
+    return {
+        "at_risk": at_risk.astype(np.int64),
+        "hazard": hazard,
+        "survival": survival,
+        "ci_lower": ci_lower,
+        "ci_upper": ci_upper
+    }
+
+""" # EXAMPLE USAGE
+curves = kaplan_meier_from_counts(events, exits, confidence=0.95) """
+
+
+def create_survival_table(df, segment_cols=("Contract", "InternetService", "PaymentMethod"),
+                          tenure_col="tenure", churn_col="Churn", confidence=0.95):
+    """
+    Build Kaplan-Meier retention curves for the whole base and for each segment column.
+    Parameters:
+    df(pd.DataFrame): customer dataset with binary churn column (1 = churned)
+    segment_cols(list): Columns to compute per-segment curves for
+    tenure_col(str, default 'tenure'): Column name for tenure in months
+    churn_col(str, default 'Churn'): Column name for churn labels
+    confidence(float, default 0.95): Confidence level of the survival bands
+
+    Returns:
+    survival_df(pd.DataFrame): one row per (segment column, segment, tenure month) with
+    at-risk, event and censored counts, hazard, survival and confidence bands
+    """
+    tables = []
+    for segment_col in [None] + list(segment_cols):
+        segments, events, exits = count_tenure_events(df, tenure_col, churn_col, segment_col)
+        curves = kaplan_meier_from_counts(events, exits, confidence)
+
+        n_segments, n_months = events.shape
+        tables.append(pd.DataFrame({
+            "SegmentColumn": "All" if segment_col is None else segment_col,
+            "Segment": np.repeat(segments, n_months),
+            tenure_col: np.tile(np.arange(n_months), n_segments),
+            "AtRisk": curves["at_risk"].ravel(),
+            "Churned": events.ravel(),
+            "Censored": (exits - events).ravel(),
+            "Hazard": curves["hazard"].ravel(),
+            "Survival": curves["survival"].ravel(),
+            "SurvivalLower": curves["ci_lower"].ravel(),
+            "SurvivalUpper": curves["ci_upper"].ravel()
+        }))
+
+    survival_df = pd.concat(tables, ignore_index=True)
+    print(f"Survival curves computed for {len(segment_cols)} segment columns over {n_months} tenure months.")
+    return survival_df
+
+""" # EXAMPLE USAGE
+survival_df = create_survival_table(df, segment_cols=["Contract", "InternetService", "PaymentMethod"]) """
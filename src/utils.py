@@ -1,6 +1,9 @@
 #Helper Functions
 import requests
 import os
+import json
+import shutil
+import numpy as np
 import pandas as pd
 
 def download_file_from_google_drive(file_id, destination):
@@ -83,6 +86,108 @@ RAW_DATA_PATH = "./data/raw/telco_customer_churn_data.csv"
 df = load_data(RAW_DATA_PATH)
 """
 
+# Raw columns kept as text so every chunk and snapshot has the same schema
+# (TotalCharges holds blanks for zero-tenure customers)
+RAW_TEXT_DTYPES = {"customerID": str, "TotalCharges": str}
+
+def ingest_snapshot(path, dataset_root, snapshot_date, partition_cols=("Contract",), chunk_size=500_000, dtype=RAW_TEXT_DTYPES):
+    """
+    Ingest one raw CSV snapshot into a Parquet dataset partitioned by snapshot date
+    (and optionally by segment columns such as 'Contract' or region).
+    Re-ingesting a snapshot date replaces its partition.
+
+    Parameters:
+    path(str): Path to the raw CSV snapshot. Must have a '.csv' extension.
+    dataset_root(str): Root directory of the partitioned dataset
+    snapshot_date(str): Snapshot key, e.g. '2026-10-01'
+    partition_cols(tuple, default ('Contract',)): Extra columns to partition each snapshot by
+    chunk_size(int, default 500000): Number of rows read and written at a time
+    dtype(dict): read_csv dtypes forced on the raw columns
+
+    Raises
+    FileNotFoundError: If the specified file does not exist.
+    ValueError: If the specified file does not have a '.csv' extension.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"CSV data file not found at: {path}")
+    if not path.lower().endswith(".csv"):
+        raise ValueError(f"File must be a CSV file. Provided file: {path}")
+
+    snapshot_dir = os.path.join(dataset_root, f"snapshot_date={snapshot_date}")
+    if os.path.exists(snapshot_dir):
+        shutil.rmtree(snapshot_dir)
+    os.makedirs(dataset_root, exist_ok=True)
+
+    n_rows = 0
+    for chunk in pd.read_csv(path, chunksize=chunk_size, dtype=dtype):
+        chunk.columns = chunk.columns.str.strip()
+        chunk["snapshot_date"] = snapshot_date
+        chunk.to_parquet(dataset_root, partition_cols=["snapshot_date"] + list(partition_cols), index=False)
+        n_rows += len(chunk)
+
+    print(f"Snapshot {snapshot_date} ingested: {n_rows} rows saved to {dataset_root}")
+
+# Example usage
+# -------------------------
+"""
+DATASET_ROOT = "./data/dataset"
+ingest_snapshot("./data/raw/telco_customer_churn_data.csv", DATASET_ROOT, "2026-10-01")
+"""
+
+def list_snapshots(dataset_root):
+    """List the snapshot dates stored in a partitioned dataset, oldest first"""
+    if not os.path.exists(dataset_root):
+        raise FileNotFoundError(f"Dataset not found at: {dataset_root}")
+    return sorted(
+        name.split("=", 1)[1] for name in os.listdir(dataset_root)
+        if name.startswith("snapshot_date=")
+    )
+
+def load_data_partitioned(dataset_root, snapshots=None, segments=None, columns=None):
+    """
+    Load snapshots from a partitioned dataset into a pandas DataFrame, reading only the
+    partitions matching the snapshots and segments and only the requested columns.
+
+    Parameters:
+    dataset_root(str): Root directory of the partitioned dataset
+    snapshots(list, optional): Snapshot dates to load, defaults to all snapshots
+    segments(dict, optional): Accepted values of partition columns, e.g. {"Contract": ["Month-to-month"]}
+    columns(list, optional): Columns to load, defaults to all columns
+
+    Returns:
+    pd.DataFrame: A pandas DataFrame containing the matching rows.
+
+    Raises
+    FileNotFoundError: If the dataset does not exist.
+    """
+    if not os.path.exists(dataset_root):
+        raise FileNotFoundError(f"Dataset not found at: {dataset_root}")
+
+    # Filters on partition columns prune whole directories before any file is opened
+    filters = []
+    if snapshots is not None:
+        filters.append(("snapshot_date", "in", list(snapshots)))
+    for col, values in (segments or {}).items():
+        filters.append((col, "in", list(values) if isinstance(values, (list, tuple, set)) else [values]))
+
+    df = pd.read_parquet(dataset_root, columns=columns, filters=filters or None)
+
+    # Partition keys come back as categoricals, restore plain text like the CSV columns
+    for col in df.columns:
+        if isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype(str)
+
+    print(f"Data loaded successfully from {dataset_root}. Shape: {df.shape}")
+    return df
+
+# Example usage
+# -------------------------
+"""
+raw_df = load_data_partitioned(DATASET_ROOT, snapshots=["2026-10-01"])
+# Monthly churn trend of month-to-month customers over all snapshots
+trend_df = load_data_partitioned(DATASET_ROOT, segments={"Contract": "Month-to-month"}, columns=["snapshot_date", "Churn"])
+"""
+
 def save_data(df, path):
     """Save cleaned DataFrame to CSV"""
     os.makedirs(os.path.dirname(path), exist_ok=True)
@@ -95,4 +200,141 @@ def save_data(df, path):
 # Paths
 PROCESSED_DATA_PATH = "./data/processed/telco_customer_churn_data_cleaned.csv"
 save_data(clean_df, PROCESSED_DATA_PATH)
-"""
\ No newline at end of file
+"""
+
+def get_numeric_feature_columns(df, columns_to_add, label_col="Churn"):
+    """
+    List the numeric feature columns of the feature groups, in DataFrame column order.
+
+    Parameters:
+    df(pd.DataFrame): full dataframe with features
+    columns_to_add(list): list of feature column lists, one per feature group (from create_all_features)
+    label_col(str, default 'Churn'): Column name of the label, never returned as a feature
+
+    Returns:
+    feature_cols(list): numeric feature column names
+    """
+    group_cols = set(col for cols in columns_to_add for col in cols)
+    return [
+        col for col in df.columns
+        if col in group_cols and col != label_col and pd.api.types.is_numeric_dtype(df[col])
+    ]
+
+
+def save_features_memmap(df, columns_to_add, sheet_names, output_dir, label_col="Churn", chunk_rows=100_000, vocabulary=None):
+    """
+    Save the numeric feature columns as a contiguous float32 .npy matrix, the label as an
+    int8 .npy vector and a JSON sidecar with column names, dtypes and feature groups.
+    Both arrays can be opened with np.load(..., mmap_mode='r') without copying them into memory.
+    With a vocabulary, the encoded categorical columns are also saved as an int16 code matrix.
+
+    Parameters:
+    df(pd.DataFrame): full dataframe with features
+    columns_to_add(list): list of feature column lists, one per feature group (from create_all_features)
+    sheet_names(list): list of feature group names (from create_all_features)
+    output_dir(str): Directory to write 'features.npy', 'labels.npy' and 'features.json' to
+    label_col(str, default 'Churn'): Column name of the label vector
+    chunk_rows(int, default 100000): Number of rows converted and written at a time
+    vocabulary(dict, optional): Output of fit_category_vocabulary, its columns (already encoded
+        with encode_categorical_columns) are written to 'category_codes.npy', -1 for unseen values
+
+    Returns:
+    feature_cols(list): the columns written to the matrix, in column order
+    """
+    if label_col not in df.columns:
+        raise KeyError(f"Label column '{label_col}' not found in DataFrame.")
+    if len(columns_to_add) != len(sheet_names):
+        raise ValueError("columns_to_add and sheet_names must have the same length.")
+
+    feature_cols = get_numeric_feature_columns(df, columns_to_add, label_col)
+    feature_groups = {
+        name: [col for col in feature_cols if col in set(cols)]
+        for name, cols in zip(sheet_names, columns_to_add)
+    }
+
+    os.makedirs(output_dir, exist_ok=True)
+    features_path = os.path.join(output_dir, "features.npy")
+    labels_path = os.path.join(output_dir, "labels.npy")
+
+    # Write row blocks straight into the memory-mapped file (row-major, contiguous)
+    features = np.lib.format.open_memmap(features_path, mode="w+", dtype=np.float32, shape=(len(df), len(feature_cols)))
+    for start in range(0, len(df), chunk_rows):
+        end = min(start + chunk_rows, len(df))
+        # Slice the rows first, selecting the columns of the full frame would copy it on every chunk
+        features[start:end] = df.iloc[start:end][feature_cols].to_numpy(dtype=np.float32)
+    features.flush()
+    del features
+
+    np.save(labels_path, df[label_col].to_numpy(dtype=np.int8))
+
+    metadata = {
+        "n_rows": len(df),
+        "columns": feature_cols,
+        "dtypes": {col: str(df[col].dtype) for col in feature_cols},
+        "feature_groups": feature_groups,
+        "label": label_col,
+        "features_file": "features.npy",
+        "labels_file": "labels.npy"
+    }
+
+    if vocabulary is not None:
+        not_encoded = [col for col in vocabulary if not isinstance(df[col].dtype, pd.CategoricalDtype)]
+        if not_encoded:
+            raise ValueError(f"Columns not encoded, run encode_categorical_columns first: {not_encoded}")
+        codes = np.column_stack([df[col].cat.codes.to_numpy(dtype=np.int16) for col in vocabulary])
+        np.save(os.path.join(output_dir, "category_codes.npy"), codes)
+        metadata["categorical"] = {
+            "columns": list(vocabulary),
+            "vocabulary": vocabulary,
+            "codes_file": "category_codes.npy"
+        }
+
+    with open(os.path.join(output_dir, "features.json"), "w") as f:
+        json.dump(metadata, f, indent=2)
+
+    print(f"Feature matrix {len(df)} x {len(feature_cols)} saved to: {output_dir}")
+    return feature_cols
+
+# Example usage
+# -------------------------
+"""
+FEATURES_MATRIX_DIR = "./data/processed/telco_customer_churn_features_matrix"
+save_features_memmap(df_features, columns_to_add, sheet_names, FEATURES_MATRIX_DIR, vocabulary=vocabulary)
+"""
+
+def load_features_memmap(input_dir, mmap_mode="r"):
+    """
+    Open a feature matrix written by save_features_memmap without loading it into memory.
+
+    Parameters:
+    input_dir(str): Directory containing 'features.npy', 'labels.npy' and 'features.json'
+    mmap_mode(str, default 'r'): np.load memory-map mode, None loads the arrays into memory
+
+    Returns:
+    features(np.memmap): float32 matrix of shape (rows, features)
+    labels(np.memmap): int8 label vector
+    metadata(dict): column names, dtypes and feature groups, and under 'categorical' the
+    code matrix file and vocabulary when saved with one (np.load it the same way)
+    """
+    metadata_path = os.path.join(input_dir, "features.json")
+    if not os.path.exists(metadata_path):
+        raise FileNotFoundError(f"Feature matrix metadata not found at: {metadata_path}")
+
+    with open(metadata_path) as f:
+        metadata = json.load(f)
+
+    features = np.load(os.path.join(input_dir, metadata["features_file"]), mmap_mode=mmap_mode)
+    labels = np.load(os.path.join(input_dir, metadata["labels_file"]), mmap_mode=mmap_mode)
+
+    if features.shape != (metadata["n_rows"], len(metadata["columns"])):
+        raise ValueError(f"Feature matrix shape {features.shape} does not match its metadata.")
+
+    print(f"Feature matrix loaded from {input_dir}. Shape: {features.shape}")
+    return features, labels, metadata
+
+# Example usage
+# -------------------------
+"""
+features, labels, metadata = load_features_memmap(FEATURES_MATRIX_DIR)
+X_contract = features[:, [metadata["columns"].index(col) for col in metadata["feature_groups"]["Contract_PaymentType Features"]]]
+"""